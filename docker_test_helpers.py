@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Helpers shared by the local Docker test scripts (test_local.py, test_pdf_docker.py)
+"""
+
+import time
+import requests
+
+def wait_ready(url, timeout=15):
+    """Poll a health endpoint with backoff until it answers 200 or timeout expires"""
+    # Probe over HTTP rather than a bare TCP connect: docker's port proxy
+    # accepts connections before the app inside the container is listening
+    start = time.monotonic()
+    delay = 0.01
+    while time.monotonic() - start < timeout:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
+    return False
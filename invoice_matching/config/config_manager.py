@@ -5,8 +5,10 @@ Handles secure storage and retrieval of database and API connection
 configurations with encryption for sensitive credentials.
 """
 
+import copy
 import os
 import json
+import tempfile
 import time
 from typing import Dict, List, Optional, Union, Any
 from pathlib import Path
@@ -17,6 +19,11 @@ from invoice_matching.models import (
 )
 from .encryption import CredentialEncryption, EncryptionError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # stdlib json is used for connections.json instead
+
 import logging
 logger = logging.getLogger(__name__)
 
@@ -56,6 +63,11 @@ class ConfigManager:
         self.backup_dir = self.config_dir / 'backups'
         self.backup_dir.mkdir(exist_ok=True)
         
+        # Parsed connections.json and the (mtime_ns, size) it was read at; a
+        # changed file on disk is re-read, otherwise lookups skip the parse
+        self._connections_cache: Optional[Dict[str, Any]] = None
+        self._connections_cache_key: Optional[tuple] = None
+        
         self.logger.info(f"Configuration manager initialized with directory: {self.config_dir}")
     
     def save_connection_config(self, config: Union[SQLConnectionConfig, APIConnectionConfig]) -> bool:
@@ -122,13 +134,15 @@ class ConfigManager:
             Connection configuration or None if not found
         """
         try:
-            connections = self._load_connections_file()
+            connections = self._read_connections()
             
             if connection_id not in connections:
                 self.logger.warning(f"Connection configuration not found: {connection_id}")
                 return None
             
-            config_data = connections[connection_id].copy()
+            # Deep copy: nested values such as additional_headers end up in the
+            # returned config and must not alias the cached file contents
+            config_data = copy.deepcopy(connections[connection_id])
             config_type = config_data.pop('config_type', 'unknown')
             
             # Remove metadata
@@ -193,26 +207,29 @@ class ConfigManager:
             List of connection information dictionaries
         """
         try:
-            connections = self._load_connections_file()
+            connections = self._read_connections()
             
+            # Summaries are projected straight from the stored dictionaries, so
+            # listing never decrypts credentials or builds config objects
             connection_list = []
             for connection_id, config_data in connections.items():
+                config_type = config_data.get('config_type', 'unknown')
                 info = {
                     'connection_id': connection_id,
-                    'config_type': config_data.get('config_type', 'unknown'),
+                    'config_type': config_type,
                     'created_at': config_data.get('created_at'),
                     'updated_at': config_data.get('updated_at')
                 }
                 
                 # Add type-specific info without sensitive data
-                if config_data.get('config_type') == 'sql':
+                if config_type == 'sql':
                     info.update({
                         'database_type': config_data.get('database_type'),
                         'host': config_data.get('host'),
                         'database': config_data.get('database'),
                         'username': config_data.get('username')
                     })
-                elif config_data.get('config_type') == 'api':
+                elif config_type == 'api':
                     info.update({
                         'base_url': config_data.get('base_url'),
                         'authentication_type': config_data.get('authentication_type'),
@@ -271,8 +288,7 @@ class ConfigManager:
             True if connection exists, False otherwise
         """
         try:
-            connections = self._load_connections_file()
-            return connection_id in connections
+            return connection_id in self._read_connections()
         except Exception as e:
             self.logger.error(f"Failed to check connection existence '{connection_id}': {e}")
             return False
@@ -382,7 +398,7 @@ class ConfigManager:
             Dictionary with configuration manager information
         """
         try:
-            connections = self._load_connections_file()
+            connections = self._read_connections()
             
             return {
                 'config_directory': str(self.config_dir),
@@ -398,23 +414,68 @@ class ConfigManager:
             self.logger.error(f"Failed to get config info: {e}")
             return {'error': str(e)}
     
-    def _load_connections_file(self) -> Dict[str, Any]:
-        """Load connections from file."""
+    def _read_connections(self) -> Dict[str, Any]:
+        """
+        Get the parsed connections file, re-reading it only when it changed.
+        
+        The returned dictionary is shared with the cache and must not be
+        modified; use _load_connections_file() for a copy to edit.
+        """
         try:
-            if not self.connections_file.exists():
-                return {}
-            
-            with open(self.connections_file, 'r') as f:
-                return json.load(f)
-                
+            stat = os.stat(self.connections_file)
+        except FileNotFoundError:
+            self._connections_cache = None
+            self._connections_cache_key = None
+            return {}
+        
+        cache_key = (stat.st_mtime_ns, stat.st_size)
+        if self._connections_cache is not None and cache_key == self._connections_cache_key:
+            return self._connections_cache
+        
+        try:
+            raw = self.connections_file.read_bytes()
+            connections = orjson.loads(raw) if orjson is not None else json.loads(raw)
         except Exception as e:
             self.logger.error(f"Failed to load connections file: {e}")
             return {}
+        
+        self._connections_cache = connections
+        self._connections_cache_key = cache_key
+        return connections
+    
+    def _load_connections_file(self) -> Dict[str, Any]:
+        """Load connections from file, as a dictionary the caller may modify."""
+        return copy.deepcopy(self._read_connections())
     
     def _save_connections_file(self, connections: Dict[str, Any]):
-        """Save connections to file."""
-        with open(self.connections_file, 'w') as f:
-            json.dump(connections, f, indent=2)
+        """Save connections to file, replacing it atomically."""
+        if orjson is not None:
+            data = orjson.dumps(connections, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(connections, indent=2).encode('utf-8')
+        
+        # Write a uniquely named file beside the target, flush it to disk and
+        # rename it over the target, so a crash never leaves a truncated
+        # connections file and concurrent writers never share a temp file
+        fd, tmp_path = tempfile.mkstemp(dir=self.config_dir, prefix='.connections-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.connections_file)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        
+        # Cache a parse of what was just written rather than the caller's
+        # dictionary, which the caller may go on to modify
+        stat = os.stat(self.connections_file)
+        self._connections_cache = orjson.loads(data) if orjson is not None else json.loads(data)
+        self._connections_cache_key = (stat.st_mtime_ns, stat.st_size)
     
     def _create_backup(self, backup_name: Optional[str] = None) -> str:
         """Create a backup of current configuration."""
@@ -426,7 +487,7 @@ class ConfigManager:
             
             backup_data = {
                 'created_at': time.time(),
-                'connections': self._load_connections_file(),
+                'connections': self._read_connections(),
                 'settings': {}
             }
             
@@ -8,6 +8,7 @@ database passwords and API keys using AES encryption.
 import os
 import base64
 import hashlib
+import string
 from typing import Optional, Union
 
 from invoice_matching.models import InvoiceMatchingError
@@ -15,6 +16,39 @@ from invoice_matching.models import InvoiceMatchingError
 import logging
 logger = logging.getLogger(__name__)
 
+# Marks AES-GCM output so it can be told apart from legacy key-mixed values
+AES_GCM_PREFIX = "aesgcm:"
+AES_GCM_NONCE_SIZE = 12
+
+# scrypt parameters for deriving the 256-bit AES key from the configured key
+KDF_SALT = b"invoice-matching-credentials"
+KDF_N = 2 ** 14
+KDF_R = 8
+KDF_P = 1
+
+# Deletes every character a (standard or URL-safe) base64 string may contain,
+# so a value is base64-shaped exactly when nothing is left after translate()
+_B64_ALPHABET_DELETE = str.maketrans('', '', string.ascii_letters + string.digits + '+/-_=')
+
+
+# cryptography pulls in its OpenSSL bindings on import, so AESGCM is only
+# loaded when the first CredentialEncryption is built
+_aesgcm_class = None
+_aesgcm_loaded = False
+
+
+def _load_aesgcm():
+    """Import AESGCM on first use; None falls back to legacy key mixing."""
+    global _aesgcm_class, _aesgcm_loaded
+    if not _aesgcm_loaded:
+        try:
+            from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        except ImportError:
+            AESGCM = None
+        _aesgcm_class = AESGCM
+        _aesgcm_loaded = True
+    return _aesgcm_class
+
 
 class EncryptionError(InvoiceMatchingError):
     """Exception raised for encryption/decryption errors."""
@@ -25,8 +59,10 @@ class CredentialEncryption:
     """
     Handles encryption and decryption of sensitive credentials.
     
-    Simplified implementation using base64 encoding for now.
-    In production, this would use proper AES encryption.
+    Uses AES-256-GCM (via the cryptography package) with a key derived from
+    the configured key by scrypt. Without cryptography installed it falls back
+    to the legacy base64 + key mixing scheme. Legacy values can always be
+    decrypted, so existing stored configurations keep loading.
     """
     
     def __init__(self, encryption_key: Optional[str] = None):
@@ -40,20 +76,40 @@ class CredentialEncryption:
         self._key = encryption_key or "default_key_2024"
         self._key_source = "provided" if encryption_key else "default"
         
+        # Derive the AES key once; every encrypt/decrypt reuses the cipher
+        self._aead = None
+        AESGCM = _load_aesgcm()
+        if AESGCM is not None:
+            aes_key = hashlib.scrypt(self._key.encode('utf-8'), salt=KDF_SALT,
+                                     n=KDF_N, r=KDF_R, p=KDF_P, dklen=32)
+            self._aead = AESGCM(aes_key)
+        
         self.logger.info(f"Encryption initialized with {self._key_source} key")
     
+    def _aes_encrypt(self, plaintext: str) -> str:
+        """Encrypt with AES-256-GCM under a fresh random nonce."""
+        nonce = os.urandom(AES_GCM_NONCE_SIZE)
+        ciphertext = self._aead.encrypt(nonce, plaintext.encode('utf-8'), None)
+        return AES_GCM_PREFIX + base64.b64encode(nonce + ciphertext).decode('ascii')
+    
+    def _aes_decrypt(self, encrypted: str) -> str:
+        """Decrypt and authenticate an AES-256-GCM value."""
+        if self._aead is None:
+            raise EncryptionError("AES-GCM value found but the cryptography package is not installed")
+        data = base64.b64decode(encrypted[len(AES_GCM_PREFIX):])
+        nonce, ciphertext = data[:AES_GCM_NONCE_SIZE], data[AES_GCM_NONCE_SIZE:]
+        return self._aead.decrypt(nonce, ciphertext, None).decode('utf-8')
+    
     def _simple_encrypt(self, plaintext: str) -> str:
         """Simple encryption using base64 and key mixing."""
         if not plaintext:
             return ""
         
         # Mix plaintext with key for basic obfuscation
-        mixed = ""
-        key_len = len(self._key)
-        for i, char in enumerate(plaintext):
-            key_char = self._key[i % key_len]
-            mixed_char = chr((ord(char) + ord(key_char)) % 256)
-            mixed += mixed_char
+        key = self._key
+        key_len = len(key)
+        mixed = ''.join([chr((ord(char) + ord(key[i % key_len])) % 256)
+                         for i, char in enumerate(plaintext)])
         
         # Encode with base64
         return base64.b64encode(mixed.encode('latin-1')).decode('utf-8')
@@ -68,14 +124,10 @@ class CredentialEncryption:
             mixed = base64.b64decode(encrypted.encode('utf-8')).decode('latin-1')
             
             # Unmix with key
-            plaintext = ""
-            key_len = len(self._key)
-            for i, char in enumerate(mixed):
-                key_char = self._key[i % key_len]
-                original_char = chr((ord(char) - ord(key_char)) % 256)
-                plaintext += original_char
-            
-            return plaintext
+            key = self._key
+            key_len = len(key)
+            return ''.join([chr((ord(char) - ord(key[i % key_len])) % 256)
+                            for i, char in enumerate(mixed)])
         except Exception:
             # If decryption fails, assume it's already plaintext
             return encrypted
@@ -97,7 +149,10 @@ class CredentialEncryption:
             return ""
         
         try:
-            encrypted_string = self._simple_encrypt(plaintext)
+            if self._aead is not None:
+                encrypted_string = self._aes_encrypt(plaintext)
+            else:
+                encrypted_string = self._simple_encrypt(plaintext)
             self.logger.debug(f"Successfully encrypted data (length: {len(plaintext)})")
             return encrypted_string
             
@@ -121,7 +176,10 @@ class CredentialEncryption:
             return ""
         
         try:
-            plaintext = self._simple_decrypt(encrypted_string)
+            if encrypted_string.startswith(AES_GCM_PREFIX):
+                plaintext = self._aes_decrypt(encrypted_string)
+            else:
+                plaintext = self._simple_decrypt(encrypted_string)
             self.logger.debug(f"Successfully decrypted data (length: {len(plaintext)})")
             return plaintext
             
@@ -141,13 +199,13 @@ class CredentialEncryption:
         if not value:
             return False
         
-        try:
-            # Try to decode as base64
-            base64.urlsafe_b64decode(value.encode('utf-8'))
-            # If it decodes successfully and has reasonable length, might be encrypted
-            return len(value) > 50 and '=' in value
-        except:
-            return False
+        if value.startswith(AES_GCM_PREFIX):
+            return True
+        
+        # Legacy values are padded base64 of reasonable length; checking the
+        # shape avoids decoding the whole value just to throw it away
+        return (len(value) > 50 and len(value) % 4 == 0 and '=' in value
+                and not value.translate(_B64_ALPHABET_DELETE))
     
     def get_key_info(self) -> dict:
         """
@@ -159,8 +217,8 @@ class CredentialEncryption:
         return {
             'initialized': bool(self._key),
             'key_source': self._key_source,
-            'algorithm': 'Simple Base64 + Key Mixing',
-            'key_derivation': 'Direct'
+            'algorithm': 'AES-256-GCM' if self._aead is not None else 'Simple Base64 + Key Mixing',
+            'key_derivation': 'scrypt' if self._aead is not None else 'Direct'
         }
 
 
@@ -8,7 +8,7 @@ This package provides connectors for various data sources including:
 - Authentication and security handling
 """
 
-from .api_connector import APIConnector, APIResponse
+from .api_connector import APIConnector, APIResponse, get_shared_session
 from .base_connector import BaseConnector, ConnectorError
 from .authentication import (
     AuthenticatorFactory, BaseAuthenticator, APIKeyAuthenticator,
@@ -19,6 +19,7 @@ from .authentication import (
 __all__ = [
     "APIConnector",
     "APIResponse", 
+    "get_shared_session",
     "BaseConnector",
     "ConnectorError",
     "AuthenticatorFactory",
@@ -6,15 +6,47 @@ methods, rate limiting, retry logic, and AWS-specific features.
 """
 
 import json
+import threading
 import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Union
 import hashlib
 import hmac
 from datetime import datetime
-from urllib.parse import urlparse, quote
+from types import MappingProxyType
+from urllib.parse import urlsplit
 
-# For now, we'll create a mock HTTP client that can be replaced with requests later
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except ImportError:
+    requests = None  # connectors fall back to MockHTTPSession
+
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    _json_loads = json.loads  # stdlib fallback; also accepts UTF-8 bytes
+    
+    def _json_dumps(obj) -> bytes:
+        """Serialize to compact UTF-8 JSON bytes, matching orjson.dumps."""
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+# Connection pool sizing for the shared HTTP session
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 50
+
+# Upper bound on concurrent searches in search_invoices_batch
+MAX_BATCH_WORKERS = 10
+
+# Retry policy applied by the HTTP adapter; retry counts come from the config
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_FORCELIST = (502, 503, 504)
+RETRY_ALLOWED_METHODS = frozenset(('GET', 'POST'))
+
+# Mock HTTP client used when requests is not installed
 class MockHTTPSession:
     """Mock HTTP session for testing without external dependencies."""
     
@@ -61,13 +93,68 @@ from invoice_matching.models import (
     AuthenticationType, InvoiceMatchingError
 )
 from .base_connector import BaseConnector, ConnectorError
-from .authentication import AuthenticatorFactory, BaseAuthenticator
+from .authentication import AuthenticatorFactory, BaseAuthenticator, _EMPTY_PAYLOAD_SHA256
 
 import logging
 logger = logging.getLogger(__name__)
 
+# RateLimiter fixed-point scale (millionths of a token). Refilling rate_limit
+# tokens per minute is elapsed_ns * rate_limit * _TOKEN_SCALE // 60e9, which
+# reduces to elapsed_ns * rate_limit // _REFILL_DIVISOR
+_TOKEN_SCALE = 1_000_000
+_REFILL_DIVISOR = 60_000_000_000 // _TOKEN_SCALE
+
+# Sentinel for response keys that are absent, as opposed to null
+_MISSING = object()
+
+# Shared HTTP sessions keyed by retry attempts
+_shared_sessions: Dict[int, Any] = {}
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session(retry_attempts: int = 3):
+    """
+    Get the process-wide HTTP session used by API connectors.
+    
+    Connectors created per search batch reuse the same pooled keep-alive
+    connections instead of paying a TCP and TLS handshake each time. Auth is
+    applied per request, so nothing connector-specific is stored on the session.
+    Retries with backoff are handled by the adapter, which also honours
+    Retry-After, so connectors share a session per retry policy.
+    
+    Args:
+        retry_attempts: Number of retries for failed connections and 502/503/504
+        
+    Returns:
+        requests.Session with a pooled, retrying HTTPAdapter, or MockHTTPSession
+        when requests is not installed
+    """
+    session = _shared_sessions.get(retry_attempts)
+    if session is None:
+        with _shared_session_lock:
+            session = _shared_sessions.get(retry_attempts)
+            if session is None:
+                if requests is None:
+                    session = MockHTTPSession()
+                else:
+                    retry = Retry(total=retry_attempts,
+                                  backoff_factor=RETRY_BACKOFF_FACTOR,
+                                  status_forcelist=RETRY_STATUS_FORCELIST,
+                                  allowed_methods=RETRY_ALLOWED_METHODS,
+                                  respect_retry_after_header=True,
+                                  raise_on_status=False)
+                    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS,
+                                          pool_maxsize=POOL_MAXSIZE,
+                                          pool_block=False,
+                                          max_retries=retry)
+                    session = requests.Session()
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                _shared_sessions[retry_attempts] = session
+    return session
 
-@dataclass
+
+@dataclass(slots=True)
 class APIResponse:
     """Response from API connector operations."""
     success: bool
@@ -81,6 +168,8 @@ class APIResponse:
 class RateLimiter:
     """Simple token bucket rate limiter."""
     
+    __slots__ = ('rate_limit', '_capacity_scaled', '_tokens_scaled', 'last_update_ns', 'lock')
+    
     def __init__(self, rate_limit: int):
         """
         Initialize rate limiter.
@@ -89,47 +178,69 @@ class RateLimiter:
             rate_limit: Maximum requests per minute
         """
         self.rate_limit = rate_limit
-        self.tokens = rate_limit
-        self.last_update = time.time()
-        self.lock = False
+        # Token counts are fixed-point integers in millionths of a token, so
+        # refills are integer math on time.monotonic_ns() readings
+        self._capacity_scaled = rate_limit * _TOKEN_SCALE
+        self._tokens_scaled = self._capacity_scaled
+        self.last_update_ns = time.monotonic_ns()
+        # Guards the refill-and-take update only; callers never sleep holding it
+        self.lock = threading.Lock()
+    
+    @property
+    def tokens(self) -> float:
+        """Tokens currently available, including any partial token."""
+        return self._tokens_scaled / _TOKEN_SCALE
     
     def acquire(self) -> bool:
         """
         Try to acquire a token for making a request.
         
+        Tokens are refilled lazily from the time elapsed since the last call,
+        so an uncontended acquire is a few integer operations.
+        
         Returns:
             True if token acquired, False if rate limited
         """
-        now = time.time()
-        time_passed = now - self.last_update
-        self.last_update = now
-        
-        # Add tokens based on time passed
-        self.tokens = min(self.rate_limit, self.tokens + time_passed * (self.rate_limit / 60.0))
-        
-        if self.tokens >= 1:
-            self.tokens -= 1
-            return True
-        return False
+        with self.lock:
+            now = time.monotonic_ns()
+            elapsed_ns = now - self.last_update_ns
+            self.last_update_ns = now
+            
+            # Add tokens based on time passed
+            tokens = min(self._capacity_scaled,
+                         self._tokens_scaled + elapsed_ns * self.rate_limit // _REFILL_DIVISOR)
+            
+            if tokens >= _TOKEN_SCALE:
+                self._tokens_scaled = tokens - _TOKEN_SCALE
+                return True
+            self._tokens_scaled = tokens
+            return False
     
     def wait_time(self) -> float:
         """Get time to wait before next request is allowed."""
-        if self.tokens >= 1:
+        missing = _TOKEN_SCALE - self._tokens_scaled
+        if missing <= 0:
             return 0.0
-        return (1 - self.tokens) * (60.0 / self.rate_limit)
+        return missing * 60.0 / (self.rate_limit * _TOKEN_SCALE)
 
 
 class AWSSignatureV4:
     """AWS Signature Version 4 signing for API requests."""
     
+    # Signed header list when the caller adds no headers of its own
+    _DEFAULT_SIGNED_HEADERS = 'host;x-amz-date'
+    
     def __init__(self, access_key: str, secret_key: str, region: str, service: str):
         self.access_key = access_key
         self.secret_key = secret_key
         self.region = region
         self.service = service
+        # (date_stamp, signing key) for the day currently being signed; the key
+        # only depends on the date for a given secret, region and service
+        self._signing_key_cache = None
     
     def sign_request(self, method: str, url: str, headers: Dict[str, str], 
-                    payload: str = '') -> Dict[str, str]:
+                    payload: Union[str, bytes] = '') -> Dict[str, str]:
         """
         Sign an HTTP request using AWS Signature V4.
         
@@ -137,30 +248,42 @@ class AWSSignatureV4:
             method: HTTP method (GET, POST, etc.)
             url: Full URL of the request
             headers: Request headers
-            payload: Request body
+            payload: Request body, as text or bytes
             
         Returns:
             Updated headers with Authorization header
         """
-        parsed_url = urlparse(url)
+        parsed_url = urlsplit(url)
         host = parsed_url.netloc
         path = parsed_url.path or '/'
         query = parsed_url.query
         
         # Create timestamp
         t = datetime.utcnow()
-        amz_date = t.strftime('%Y%m%dT%H%M%SZ')
-        date_stamp = t.strftime('%Y%m%d')
+        # Fixed-width field formatting; strftime parses its format on every call
+        date_stamp = f"{t.year:04d}{t.month:02d}{t.day:02d}"
+        amz_date = f"{date_stamp}T{t.hour:02d}{t.minute:02d}{t.second:02d}Z"
         
-        # Add required headers
-        headers = headers.copy()
-        headers['Host'] = host
-        headers['X-Amz-Date'] = amz_date
-        
-        # Create canonical request
-        canonical_headers = '\n'.join([f"{k.lower()}:{v}" for k, v in sorted(headers.items())]) + '\n'
-        signed_headers = ';'.join([k.lower() for k in sorted(headers.keys())])
-        payload_hash = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        # Create canonical request; with no caller headers only Host and
+        # X-Amz-Date are signed, so their order and names are known up front
+        if headers:
+            headers = headers.copy()
+            headers['Host'] = host
+            headers['X-Amz-Date'] = amz_date
+            # Lowercase and sort the names once, then reuse them for both lists
+            canonical_items = sorted([(k.lower(), v) for k, v in headers.items()])
+            canonical_headers = ''.join([f"{k}:{v}\n" for k, v in canonical_items])
+            signed_headers = ';'.join([k for k, _ in canonical_items])
+        else:
+            headers = {'Host': host, 'X-Amz-Date': amz_date}
+            canonical_headers = f"host:{host}\nx-amz-date:{amz_date}\n"
+            signed_headers = self._DEFAULT_SIGNED_HEADERS
+        if not payload:
+            payload_hash = _EMPTY_PAYLOAD_SHA256
+        else:
+            if isinstance(payload, str):
+                payload = payload.encode('utf-8')
+            payload_hash = hashlib.sha256(payload).hexdigest()
         
         canonical_request = f"{method}\n{path}\n{query}\n{canonical_headers}\n{signed_headers}\n{payload_hash}"
         
@@ -170,8 +293,8 @@ class AWSSignatureV4:
         string_to_sign = f"{algorithm}\n{amz_date}\n{credential_scope}\n{hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()}"
         
         # Calculate signature
-        signing_key = self._get_signature_key(self.secret_key, date_stamp, self.region, self.service)
-        signature = hmac.new(signing_key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+        signing_key = self._get_cached_signing_key(date_stamp)
+        signature = hmac.digest(signing_key, string_to_sign.encode('utf-8'), 'sha256').hex()
         
         # Add authorization header
         authorization_header = f"{algorithm} Credential={self.access_key}/{credential_scope}, SignedHeaders={signed_headers}, Signature={signature}"
@@ -179,12 +302,21 @@ class AWSSignatureV4:
         
         return headers
     
+    def _get_cached_signing_key(self, date_stamp: str) -> bytes:
+        """Return the signing key for a date, deriving it at most once per day."""
+        cached = self._signing_key_cache
+        if cached is None or cached[0] != date_stamp:
+            cached = (date_stamp, self._get_signature_key(self.secret_key, date_stamp, self.region, self.service))
+            self._signing_key_cache = cached
+        return cached[1]
+    
     def _get_signature_key(self, key: str, date_stamp: str, region_name: str, service_name: str) -> bytes:
         """Generate AWS signature key."""
-        k_date = hmac.new(('AWS4' + key).encode('utf-8'), date_stamp.encode('utf-8'), hashlib.sha256).digest()
-        k_region = hmac.new(k_date, region_name.encode('utf-8'), hashlib.sha256).digest()
-        k_service = hmac.new(k_region, service_name.encode('utf-8'), hashlib.sha256).digest()
-        k_signing = hmac.new(k_service, b'aws4_request', hashlib.sha256).digest()
+        # hmac.digest is a single C call, without building an HMAC object per step
+        k_date = hmac.digest(('AWS4' + key).encode('utf-8'), date_stamp.encode('utf-8'), 'sha256')
+        k_region = hmac.digest(k_date, region_name.encode('utf-8'), 'sha256')
+        k_service = hmac.digest(k_region, service_name.encode('utf-8'), 'sha256')
+        k_signing = hmac.digest(k_service, b'aws4_request', 'sha256')
         return k_signing
 
 
@@ -196,6 +328,33 @@ class APIConnector(BaseConnector):
     retry logic, and AWS-specific features like Signature V4.
     """
     
+    # Live connectors by connection_id, for from_pool(); entries drop out once
+    # no caller holds the connector
+    _pool: 'weakref.WeakValueDictionary[str, APIConnector]' = weakref.WeakValueDictionary()
+    _pool_lock = threading.Lock()
+    
+    @classmethod
+    def from_pool(cls, config: APIConnectionConfig) -> 'APIConnector':
+        """
+        Get a live connector for a configuration, creating it only if needed.
+        
+        A connector is reused when one with the same connection_id and an equal
+        configuration is still alive, so its rate limiter and authenticator are
+        shared rather than rebuilt.
+        
+        Args:
+            config: API connection configuration
+            
+        Returns:
+            APIConnector for the configuration
+        """
+        with cls._pool_lock:
+            connector = cls._pool.get(config.connection_id)
+            if connector is None or connector.config != config:
+                connector = cls(config)
+                cls._pool[config.connection_id] = connector
+            return connector
+    
     def __init__(self, config: APIConnectionConfig):
         """
         Initialize API connector.
@@ -207,8 +366,29 @@ class APIConnector(BaseConnector):
         self.config = config
         self.rate_limiter = RateLimiter(config.rate_limit)
         
-        # Setup HTTP session (using mock for now, will be replaced with requests)
-        self.session = MockHTTPSession()
+        # Shared pooled HTTP session, reused across connectors for the same host;
+        # its adapter retries failed requests with backoff
+        self.session = get_shared_session(config.retry_attempts)
+        
+        # Static search request headers and URL, built once; auth headers are
+        # added per call on a copy, so this dict is never mutated
+        self._search_url = f"{config.base_url.rstrip('/')}/invoices/search"
+        self._search_headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        }
+        
+        # Read-only part of get_connection_info(), which only adds health fields
+        self._static_info = MappingProxyType({
+            'connection_id': self.connection_id,
+            'connection_type': 'REST_API',
+            'base_url': config.base_url,
+            'authentication_type': config.authentication_type.value,
+            'rate_limit': config.rate_limit,
+            'timeout': config.timeout,
+            'retry_attempts': config.retry_attempts,
+            'aws_region': config.aws_region
+        })
         
         # Setup authentication using the new authentication system
         self.authenticator = self._create_authenticator()
@@ -343,29 +523,67 @@ class APIConnector(BaseConnector):
                     if not self.rate_limiter.acquire():
                         raise ConnectorError("Rate limit exceeded")
             
-            # Prepare search request
-            search_url = f"{self.config.base_url.rstrip('/')}/invoices/search"
-            
-            response = self._make_request('POST', search_url, json=search_criteria)
+            response = self._make_request('POST', self._search_url,
+                                          headers=self._search_headers,
+                                          json=search_criteria)
             
             if not response.success:
                 raise ConnectorError(f"Search failed: {response.error_message}")
             
-            # Extract invoice data from response
-            if isinstance(response.data, list):
-                return response.data
-            elif isinstance(response.data, dict) and 'invoices' in response.data:
-                return response.data['invoices']
-            elif isinstance(response.data, dict) and 'results' in response.data:
-                return response.data['results']
-            else:
-                return [response.data] if response.data else []
+            return self._extract_invoices(response.data)
                 
         except ConnectorError:
             raise
         except Exception as e:
             raise self._handle_error("Invoice search", e)
     
+    def search_invoices_batch(self, criteria_list: List[Dict[str, Any]],
+                              max_workers: int = MAX_BATCH_WORKERS) -> List[List[Dict[str, Any]]]:
+        """
+        Run several invoice searches concurrently.
+        
+        Searches share the pooled keep-alive connections of the HTTP session,
+        so concurrent lookups against one host skip connection setup, and each
+        one still goes through the rate limiter.
+        
+        Args:
+            criteria_list: Search parameters, one dictionary per search
+            max_workers: Maximum number of searches in flight at once
+            
+        Returns:
+            Matching invoice records for each search, in the order given
+            
+        Raises:
+            ConnectorError: If any search fails
+        """
+        if not criteria_list:
+            return []
+        if len(criteria_list) == 1:
+            return [self.search_invoices(criteria_list[0])]
+        
+        workers = min(max_workers, len(criteria_list))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.search_invoices, criteria_list))
+    
+    @staticmethod
+    def _extract_invoices(data: Any) -> List[Dict[str, Any]]:
+        """
+        Normalize a search response body to a list of invoice records.
+        
+        Accepts a bare list, {"invoices": [...]} or {"results": [...]}; any
+        other non-empty body is returned as a single record.
+        """
+        if type(data) is list:
+            return data
+        if type(data) is dict:
+            invoices = data.get('invoices', _MISSING)
+            if invoices is not _MISSING:
+                return invoices
+            invoices = data.get('results', _MISSING)
+            if invoices is not _MISSING:
+                return invoices
+        return [data] if data else []
+    
     def _make_request(self, method: str, url: str, **kwargs) -> APIResponse:
         """
         Make an HTTP request with proper error handling and logging.
@@ -384,11 +602,13 @@ class APIConnector(BaseConnector):
             # Prepare headers
             headers = kwargs.pop('headers', {})
             
-            # Prepare payload for authentication
+            # Serialize a JSON body once; the same bytes are signed and sent
             payload = ''
             if 'json' in kwargs:
-                payload = json.dumps(kwargs['json'])
-                headers['Content-Type'] = 'application/json'
+                payload = _json_dumps(kwargs.pop('json'))
+                kwargs['data'] = payload
+                if 'Content-Type' not in headers:
+                    headers = {**headers, 'Content-Type': 'application/json'}
             elif 'data' in kwargs:
                 payload = kwargs['data']
             
@@ -411,10 +631,11 @@ class APIConnector(BaseConnector):
             
             duration = time.time() - start_time
             
-            # Parse response
+            # Parse the raw body directly; skips decoding it to response.text first
+            content = response.content
             try:
-                data = response.json() if response.content else None
-            except json.JSONDecodeError:
+                data = _json_loads(content) if content else None
+            except ValueError:
                 data = {'raw_response': response.text}
             
             success = response.status_code < 400
@@ -456,14 +677,7 @@ class APIConnector(BaseConnector):
             Dictionary containing connection metadata
         """
         return {
-            'connection_id': self.connection_id,
-            'connection_type': 'REST_API',
-            'base_url': self.config.base_url,
-            'authentication_type': self.config.authentication_type.value,
-            'rate_limit': self.config.rate_limit,
-            'timeout': self.config.timeout,
-            'retry_attempts': self.config.retry_attempts,
-            'aws_region': self.config.aws_region,
+            **self._static_info,
             'healthy': self.is_healthy(),
             'last_test': self._last_connection_test.to_dict() if self._last_connection_test else None
         }
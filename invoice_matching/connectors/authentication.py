@@ -7,19 +7,32 @@ token management and refresh capabilities.
 """
 
 import json
+import threading
 import time
 import hashlib
 import hmac
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Any, List
-from urllib.parse import urlparse
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, Tuple, Union
+from urllib.parse import urlsplit
 
 from invoice_matching.models import AuthenticationType, InvoiceMatchingError
 
+try:
+    from pybase64 import b64encode_as_string as _b64encode_str
+except ImportError:
+    import base64
+    
+    def _b64encode_str(data: bytes) -> str:
+        """Base64-encode bytes to str (stdlib fallback for pybase64)."""
+        return base64.b64encode(data).decode('ascii')
+
 import logging
 logger = logging.getLogger(__name__)
 
+# SHA-256 of an empty request body, used for every bodyless signed request
+_EMPTY_PAYLOAD_SHA256 = hashlib.sha256(b'').hexdigest()
+
 
 class AuthenticationError(InvoiceMatchingError):
     """Exception raised for authentication-related errors."""
@@ -97,6 +110,9 @@ class APIKeyAuthenticator(BaseAuthenticator):
 class BearerTokenAuthenticator(BaseAuthenticator):
     """Bearer Token authentication with refresh capability."""
     
+    # Tokens are treated as expired this many seconds before expires_at
+    EXPIRY_BUFFER_SECONDS = 300
+    
     def __init__(self, access_token: str, refresh_token: Optional[str] = None,
                  expires_at: Optional[datetime] = None, refresh_url: Optional[str] = None):
         """
@@ -113,10 +129,28 @@ class BearerTokenAuthenticator(BaseAuthenticator):
         self.refresh_token = refresh_token
         self.expires_at = expires_at
         self.refresh_url = refresh_url
-        self._refresh_in_progress = False
+        # Held for the duration of a refresh so concurrent callers share it
+        self._refresh_lock = threading.Lock()
         
         self.logger.info(f"Bearer token authenticator initialized, expires: {expires_at}")
     
+    @property
+    def expires_at(self) -> Optional[datetime]:
+        """Token expiration time (naive datetimes are taken as UTC)."""
+        return self._expires_at
+    
+    @expires_at.setter
+    def expires_at(self, value: Optional[datetime]):
+        self._expires_at = value
+        # Epoch second after which is_valid() fails, so the check is one float
+        # compare against time.time() instead of building datetimes per call
+        if value is None:
+            self._valid_until_ts = None
+        else:
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            self._valid_until_ts = value.timestamp() - self.EXPIRY_BUFFER_SECONDS
+    
     def apply_authentication(self, headers: Dict[str, str], **kwargs) -> Dict[str, str]:
         """Apply Bearer token to request headers."""
         if not self.is_valid():
@@ -132,10 +166,9 @@ class BearerTokenAuthenticator(BaseAuthenticator):
         if not self.access_token:
             return False
         
-        if self.expires_at:
-            # Add 5 minute buffer before expiration
-            buffer_time = datetime.utcnow() + timedelta(minutes=5)
-            return self.expires_at > buffer_time
+        if self._valid_until_ts is not None:
+            # Includes a 5 minute buffer before expiration
+            return time.time() < self._valid_until_ts
         
         return True
     
@@ -144,26 +177,29 @@ class BearerTokenAuthenticator(BaseAuthenticator):
         if self.is_valid():
             return True
         
-        if not self.refresh_token or not self.refresh_url or self._refresh_in_progress:
+        if not self.refresh_token or not self.refresh_url:
             return False
         
-        try:
-            self._refresh_in_progress = True
-            self.logger.info("Attempting to refresh Bearer token")
-            
-            # In a real implementation, this would make an HTTP request
-            # For now, we'll simulate a successful refresh
-            self.access_token = f"refreshed_{self.access_token}"
-            self.expires_at = datetime.utcnow() + timedelta(hours=1)
-            
-            self.logger.info("Bearer token refreshed successfully")
-            return True
+        with self._refresh_lock:
+            # Another thread may have refreshed while this one waited for the
+            # lock; its token is reused rather than refreshing again
+            if self.is_valid():
+                return True
             
-        except Exception as e:
-            self.logger.error(f"Token refresh failed: {e}")
-            return False
-        finally:
-            self._refresh_in_progress = False
+            try:
+                self.logger.info("Attempting to refresh Bearer token")
+                
+                # In a real implementation, this would make an HTTP request
+                # For now, we'll simulate a successful refresh
+                self.access_token = f"refreshed_{self.access_token}"
+                self.expires_at = datetime.utcnow() + timedelta(hours=1)
+                
+                self.logger.info("Bearer token refreshed successfully")
+                return True
+                
+            except Exception as e:
+                self.logger.error(f"Token refresh failed: {e}")
+                return False
 
 
 class BasicAuthAuthenticator(BaseAuthenticator):
@@ -180,19 +216,28 @@ class BasicAuthAuthenticator(BaseAuthenticator):
         super().__init__(AuthenticationType.BASIC_AUTH)
         self.username = username
         self.password = password
+        # (username, password, header value) for the credentials last encoded;
+        # built here so requests only pay for the encoding if credentials change
+        self._header_cache = self._encode_header(username, password)
         self.logger.info(f"Basic auth authenticator initialized for user: {username}")
     
     def apply_authentication(self, headers: Dict[str, str], **kwargs) -> Dict[str, str]:
         """Apply Basic authentication to request headers."""
-        import base64
-        
-        credentials = f"{self.username}:{self.password}"
-        encoded_credentials = base64.b64encode(credentials.encode('utf-8')).decode('utf-8')
+        cached = self._header_cache
+        if cached[0] != self.username or cached[1] != self.password:
+            cached = self._encode_header(self.username, self.password)
+            self._header_cache = cached
         
         headers = headers.copy()
-        headers['Authorization'] = f'Basic {encoded_credentials}'
+        headers['Authorization'] = cached[2]
         return headers
     
+    @staticmethod
+    def _encode_header(username: str, password: str) -> Tuple[str, str, str]:
+        """Build the (username, password, header value) cache entry."""
+        encoded_credentials = _b64encode_str(f"{username}:{password}".encode('utf-8'))
+        return (username, password, f'Basic {encoded_credentials}')
+    
     def is_valid(self) -> bool:
         """Basic auth credentials don't expire."""
         return bool(self.username and self.password)
@@ -219,6 +264,9 @@ class AWSIAMAuthenticator(BaseAuthenticator):
         self.region = region
         self.service = service
         self.session_token = session_token
+        # (date_stamp, secret_key, region, service, signing key) for the last
+        # key derived; the key only changes with the UTC date or credentials
+        self._signing_key_cache = None
         
         self.logger.info(f"AWS IAM authenticator initialized for region: {region}, service: {service}")
     
@@ -237,7 +285,8 @@ class AWSIAMAuthenticator(BaseAuthenticator):
         """Check if AWS credentials are present."""
         return bool(self.access_key and self.secret_key and self.region)
     
-    def _sign_request(self, method: str, url: str, headers: Dict[str, str], payload: str) -> Dict[str, str]:
+    def _sign_request(self, method: str, url: str, headers: Dict[str, str],
+                      payload: Union[str, bytes]) -> Dict[str, str]:
         """
         Sign HTTP request using AWS Signature Version 4.
         
@@ -245,20 +294,21 @@ class AWSIAMAuthenticator(BaseAuthenticator):
             method: HTTP method
             url: Request URL
             headers: Request headers
-            payload: Request body
+            payload: Request body, as text or the exact bytes being sent
             
         Returns:
             Headers with AWS signature
         """
-        parsed_url = urlparse(url)
+        parsed_url = urlsplit(url)
         host = parsed_url.netloc
         path = parsed_url.path or '/'
         query = parsed_url.query
         
         # Create timestamp
         t = datetime.utcnow()
-        amz_date = t.strftime('%Y%m%dT%H%M%SZ')
-        date_stamp = t.strftime('%Y%m%d')
+        # Fixed-width field formatting; strftime parses its format on every call
+        date_stamp = f"{t.year:04d}{t.month:02d}{t.day:02d}"
+        amz_date = f"{date_stamp}T{t.hour:02d}{t.minute:02d}{t.second:02d}Z"
         
         # Prepare headers
         headers = headers.copy()
@@ -269,9 +319,16 @@ class AWSIAMAuthenticator(BaseAuthenticator):
             headers['X-Amz-Security-Token'] = self.session_token
         
         # Create canonical request
-        canonical_headers = '\n'.join([f"{k.lower()}:{v.strip()}" for k, v in sorted(headers.items())]) + '\n'
-        signed_headers = ';'.join([k.lower() for k in sorted(headers.keys())])
-        payload_hash = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        # Lowercase and sort the names once, then reuse them for both lists
+        canonical_items = sorted([(k.lower(), v.strip()) for k, v in headers.items()])
+        canonical_headers = ''.join([f"{k}:{v}\n" for k, v in canonical_items])
+        signed_headers = ';'.join([k for k, _ in canonical_items])
+        if not payload:
+            payload_hash = _EMPTY_PAYLOAD_SHA256
+        else:
+            if isinstance(payload, str):
+                payload = payload.encode('utf-8')
+            payload_hash = hashlib.sha256(payload).hexdigest()
         
         canonical_request = f"{method}\n{path}\n{query}\n{canonical_headers}\n{signed_headers}\n{payload_hash}"
         
@@ -281,8 +338,8 @@ class AWSIAMAuthenticator(BaseAuthenticator):
         string_to_sign = f"{algorithm}\n{amz_date}\n{credential_scope}\n{hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()}"
         
         # Calculate signature
-        signing_key = self._get_signature_key(date_stamp)
-        signature = hmac.new(signing_key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+        signing_key = self._get_cached_signing_key(date_stamp)
+        signature = hmac.digest(signing_key, string_to_sign.encode('utf-8'), 'sha256').hex()
         
         # Create authorization header
         authorization_header = (
@@ -297,13 +354,23 @@ class AWSIAMAuthenticator(BaseAuthenticator):
         self.logger.debug(f"AWS request signed for {method} {url}")
         return headers
     
+    def _get_cached_signing_key(self, date_stamp: str) -> bytes:
+        """Return the signing key for a date, deriving it at most once per day."""
+        cached = self._signing_key_cache
+        if cached is None or cached[:4] != (date_stamp, self.secret_key, self.region, self.service):
+            signing_key = self._get_signature_key(date_stamp)
+            cached = (date_stamp, self.secret_key, self.region, self.service, signing_key)
+            self._signing_key_cache = cached
+        return cached[4]
+    
     def _get_signature_key(self, date_stamp: str) -> bytes:
         """Generate AWS signature key."""
-        k_date = hmac.new(('AWS4' + self.secret_key).encode('utf-8'), 
-                         date_stamp.encode('utf-8'), hashlib.sha256).digest()
-        k_region = hmac.new(k_date, self.region.encode('utf-8'), hashlib.sha256).digest()
-        k_service = hmac.new(k_region, self.service.encode('utf-8'), hashlib.sha256).digest()
-        k_signing = hmac.new(k_service, b'aws4_request', hashlib.sha256).digest()
+        # hmac.digest is a single C call, without building an HMAC object per step
+        k_date = hmac.digest(('AWS4' + self.secret_key).encode('utf-8'), 
+                             date_stamp.encode('utf-8'), 'sha256')
+        k_region = hmac.digest(k_date, self.region.encode('utf-8'), 'sha256')
+        k_service = hmac.digest(k_region, self.service.encode('utf-8'), 'sha256')
+        k_signing = hmac.digest(k_service, b'aws4_request', 'sha256')
         return k_signing
 
 
@@ -328,54 +395,64 @@ class AuthenticatorFactory:
             AuthenticationError: If authenticator cannot be created
         """
         try:
-            if auth_type == AuthenticationType.API_KEY:
-                header_name = kwargs.get('header_name', 'X-API-Key')
-                return APIKeyAuthenticator(credentials, header_name)
-            
-            elif auth_type == AuthenticationType.BEARER_TOKEN:
-                # For Bearer tokens, credentials might be just the token
-                # or a JSON string with token details
-                try:
-                    token_data = json.loads(credentials)
-                    return BearerTokenAuthenticator(
-                        access_token=token_data['access_token'],
-                        refresh_token=token_data.get('refresh_token'),
-                        expires_at=datetime.fromisoformat(token_data['expires_at']) if token_data.get('expires_at') else None,
-                        refresh_url=token_data.get('refresh_url')
-                    )
-                except (json.JSONDecodeError, KeyError):
-                    # Treat as simple access token
-                    return BearerTokenAuthenticator(credentials)
-            
-            elif auth_type == AuthenticationType.BASIC_AUTH:
-                if ':' not in credentials:
-                    raise AuthenticationError("Basic auth credentials must be in format 'username:password'")
-                username, password = credentials.split(':', 1)
-                return BasicAuthAuthenticator(username, password)
-            
-            elif auth_type == AuthenticationType.AWS_IAM:
-                if ':' not in credentials:
-                    raise AuthenticationError("AWS IAM credentials must be in format 'access_key:secret_key'")
-                
-                access_key, secret_key = credentials.split(':', 1)
-                region = kwargs.get('region', 'us-east-1')
-                service = kwargs.get('service', 'execute-api')
-                session_token = kwargs.get('session_token')
-                
-                return AWSIAMAuthenticator(access_key, secret_key, region, service, session_token)
-            
-            else:
+            builder = AuthenticatorFactory._BUILDERS.get(auth_type)
+            if builder is None:
                 raise AuthenticationError(f"Unsupported authentication type: {auth_type}")
+            return builder(credentials, **kwargs)
                 
         except Exception as e:
             raise AuthenticationError(f"Failed to create authenticator: {e}")
     
+    @staticmethod
+    def _create_api_key(credentials: str, **kwargs) -> BaseAuthenticator:
+        header_name = kwargs.get('header_name', 'X-API-Key')
+        return APIKeyAuthenticator(credentials, header_name)
+    
+    @staticmethod
+    def _create_bearer_token(credentials: str, **kwargs) -> BaseAuthenticator:
+        # For Bearer tokens, credentials might be just the token
+        # or a JSON string with token details
+        try:
+            token_data = json.loads(credentials)
+            return BearerTokenAuthenticator(
+                access_token=token_data['access_token'],
+                refresh_token=token_data.get('refresh_token'),
+                expires_at=datetime.fromisoformat(token_data['expires_at']) if token_data.get('expires_at') else None,
+                refresh_url=token_data.get('refresh_url')
+            )
+        except (json.JSONDecodeError, KeyError):
+            # Treat as simple access token
+            return BearerTokenAuthenticator(credentials)
+    
+    @staticmethod
+    def _create_basic_auth(credentials: str, **kwargs) -> BaseAuthenticator:
+        if ':' not in credentials:
+            raise AuthenticationError("Basic auth credentials must be in format 'username:password'")
+        username, password = credentials.split(':', 1)
+        return BasicAuthAuthenticator(username, password)
+    
+    @staticmethod
+    def _create_aws_iam(credentials: str, **kwargs) -> BaseAuthenticator:
+        if ':' not in credentials:
+            raise AuthenticationError("AWS IAM credentials must be in format 'access_key:secret_key'")
+        
+        access_key, secret_key = credentials.split(':', 1)
+        region = kwargs.get('region', 'us-east-1')
+        service = kwargs.get('service', 'execute-api')
+        session_token = kwargs.get('session_token')
+        
+        return AWSIAMAuthenticator(access_key, secret_key, region, service, session_token)
+    
+    # One lookup picks the builder for an authentication type
+    _BUILDERS = {
+        AuthenticationType.API_KEY: _create_api_key,
+        AuthenticationType.BEARER_TOKEN: _create_bearer_token,
+        AuthenticationType.BASIC_AUTH: _create_basic_auth,
+        AuthenticationType.AWS_IAM: _create_aws_iam
+    }
+    _SUPPORTED_TYPES = tuple(_BUILDERS)
+    
     @staticmethod
     def get_supported_types() -> List[AuthenticationType]:
         """Get list of supported authentication types."""
-        return [
-            AuthenticationType.API_KEY,
-            AuthenticationType.BEARER_TOKEN,
-            AuthenticationType.BASIC_AUTH,
-            AuthenticationType.AWS_IAM
-        ]
\ No newline at end of file
+        return list(AuthenticatorFactory._SUPPORTED_TYPES)
\ No newline at end of file
@@ -1,46 +1,249 @@
+import contextlib
+import functools
+import gc
+import hashlib
+import importlib.util
+import inspect
 import logging
+import mmap
+import pickle
+import re
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 import pandas as pd
-import io
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 import pdfplumber
 
 _log = logging.getLogger(__name__)
 
+# Set PDFTOCSV_CACHE_DIR to reuse extraction results for files that have
+# already been processed (used by the local test scripts, off by default)
+CACHE_DIR_ENV = 'PDFTOCSV_CACHE_DIR'
+
+# Run a garbage collection after every this many pages of pdfplumber output
+PAGE_BATCH_SIZE = 50
+
+# Number of worker processes for pdfplumber table extraction (1 = in-process).
+# Each worker opens its own copy of the PDF, so only raise this where memory allows.
+WORKERS_ENV = 'PDFTOCSV_WORKERS'
+
 def is_running_on_apprunner():
     """Check if the code is running on AWS App Runner"""
     return os.environ.get('AWS_EXECUTION_ENV') is not None
 
+# Pattern for invoice lines: LINE_NUM DATE TYPE INVOICE_NUM [PO_NUM] AMOUNT [INVOICE_NUM AMOUNT]
+INVOICE_LINE_PATTERN = re.compile(r'^(\d+)\s+(\d{2}/\d{2}/\d{2,4})\s+(INVOICE|CREDIT MEMO)\s+(\d+)\s+(?:([A-Z0-9]+)\s+)?(-?\d+\.\d{2})\s+\d+\s+-?\d+\.\d{2}\s*$')
+
+# Field order of the row tuples returned by extract_invoice_lines_from_text
+INVOICE_LINE_COLUMNS = ('Line', 'Date', 'Type', 'Invoice_Number', 'PO_Number', 'Amount')
+
 def extract_invoice_lines_from_text(text):
-    """Extract structured invoice lines from text"""
-    import re
-    lines = text.split('\n')
+    """
+    Extract structured invoice lines from text.
+    Each line is a plain tuple in INVOICE_LINE_COLUMNS order, which keeps
+    per-row overhead low on long statements.
+    """
     invoice_lines = []
     
-    # Pattern for invoice lines: LINE_NUM DATE TYPE INVOICE_NUM [PO_NUM] AMOUNT [INVOICE_NUM AMOUNT]
-    invoice_pattern = r'^(\d+)\s+(\d{2}/\d{2}/\d{2,4})\s+(INVOICE|CREDIT MEMO)\s+(\d+)\s+(?:([A-Z0-9]+)\s+)?(-?\d+\.\d{2})\s+\d+\s+-?\d+\.\d{2}\s*$'
-    
-    for line in lines:
-        line = line.strip()
-        match = re.match(invoice_pattern, line)
+    for line in text.split('\n'):
+        match = INVOICE_LINE_PATTERN.match(line.strip())
         if match:
             line_num, date, doc_type, invoice_num, po_num, amount = match.groups()
-            invoice_lines.append({
-                'Line': line_num,
-                'Date': date,
-                'Type': doc_type,
-                'Invoice_Number': invoice_num,
-                'PO_Number': po_num or '',
-                'Amount': float(amount)
-            })
+            invoice_lines.append((line_num, date, doc_type, invoice_num, po_num or '', float(amount)))
     
     return invoice_lines
 
-def extract_tables_from_file_pdfplumber(input_doc_path_str: str, output_csv_path_str: str | None = None):
+def _file_md5(path):
+    """MD5 of a file's contents, read in chunks"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+@functools.lru_cache(maxsize=None)
+def _code_version():
+    """Short hash of this module's source, so cached results from older code are not reused"""
+    return _file_md5(__file__)[:12]
+
+# Most recent extraction results kept in memory, keyed by (path, mtime, size, method)
+_recent_extractions = OrderedDict()
+RECENT_EXTRACTIONS_SIZE = 8
+
+def _write_cached_csv(output_csv_path_str, csv_bytes):
+    if csv_bytes is not None:
+        output_csv_path = Path(output_csv_path_str)
+        output_csv_path.parent.mkdir(parents=True, exist_ok=True)
+        output_csv_path.write_bytes(csv_bytes)
+
+def cached_extraction(method):
+    """
+    Cache an extractor's tables and CSV output, keyed by the input file and the
+    extraction method. Recent results are kept in memory (keyed by path and
+    mtime) in front of an on-disk cache keyed by the file's MD5 and a hash of
+    this module. Only active when PDFTOCSV_CACHE_DIR is set and an output path
+    is given; pass force_refresh=True (keyword only) to bypass it. Cached
+    results are never read when the CI environment variable is set.
     """
-    Extract tables from a PDF file using improved pdfplumber logic
+    def decorator(func):
+        # Names of the extractor's parameters after the input and output paths,
+        # so options passed positionally are keyed and forwarded like keywords
+        option_names = list(inspect.signature(func).parameters)[2:]
+
+        @functools.wraps(func)
+        def wrapper(input_doc_path_str: str, output_csv_path_str: str | None = None, *args, force_refresh: bool = False, **options):
+            if len(args) > len(option_names):
+                raise TypeError(f"{func.__name__}() takes at most {len(option_names) + 2} positional arguments")
+            for name, value in zip(option_names, args):
+                if name in options:
+                    raise TypeError(f"{func.__name__}() got multiple values for argument '{name}'")
+                options[name] = value
+
+            cache_dir = os.environ.get(CACHE_DIR_ENV)
+            if not cache_dir or not output_csv_path_str or not os.path.isfile(input_doc_path_str):
+                return func(input_doc_path_str, output_csv_path_str, **options)
+
+            force_refresh = force_refresh or bool(os.environ.get('CI'))
+
+            # Extraction options (such as a page selection) and the code version
+            # are part of the cache key
+            variant = method + f"_v{_code_version()}" + ''.join(
+                f"_{name}-{'-'.join(map(str, value)) if isinstance(value, (list, tuple)) else value}"
+                for name, value in sorted(options.items()) if value is not None
+            )
+
+            stat = os.stat(input_doc_path_str)
+            memo_key = (os.path.realpath(input_doc_path_str), stat.st_mtime_ns, stat.st_size, variant)
+            entry = None
+            if not force_refresh:
+                entry = _recent_extractions.get(memo_key)
+                if entry is not None:
+                    _recent_extractions.move_to_end(memo_key)
+                    _log.info(f"Using {method} extraction from memory for {input_doc_path_str}")
+
+            cache_path = None
+            if entry is None:
+                cache_path = Path(cache_dir) / f"{_file_md5(input_doc_path_str)}_{variant}.pkl"
+                if not force_refresh and cache_path.is_file():
+                    try:
+                        with open(cache_path, 'rb') as f:
+                            entry = pickle.load(f)
+                        _log.info(f"Using cached {method} extraction from {cache_path}")
+                    except Exception as e:
+                        _log.warning(f"Ignoring unreadable extraction cache {cache_path}: {e}")
+
+            if entry is not None:
+                tables, csv_bytes = entry
+                _write_cached_csv(output_csv_path_str, csv_bytes)
+            else:
+                tables = func(input_doc_path_str, output_csv_path_str, **options)
+                if not tables:
+                    return tables
+                output_csv_path = Path(output_csv_path_str)
+                entry = (tables, output_csv_path.read_bytes() if output_csv_path.is_file() else None)
+                try:
+                    cache_path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(cache_path, 'wb') as f:
+                        pickle.dump(entry, f)
+                except Exception as e:
+                    _log.warning(f"Could not write extraction cache {cache_path}: {e}")
+
+            _recent_extractions[memo_key] = entry
+            while len(_recent_extractions) > RECENT_EXTRACTIONS_SIZE:
+                _recent_extractions.popitem(last=False)
+            # Callers get their own copies so changes they make to a DataFrame
+            # (renames, inplace fills) never reach the cached results
+            return [df.copy() for df in tables]
+        return wrapper
+    return decorator
+
+# Output CSVs are written through a 1MB buffer so large files take few write calls
+CSV_WRITE_BUFFER_SIZE = 1 << 20
+
+def write_tables_to_csv(tables, output_csv_path):
+    """
+    Write tables one after another into a single CSV file, with the header of
+    the first table only. Each table is streamed straight into the open file
+    rather than rendered to an in-memory string and joined first.
+    """
+    output_file = None
+    try:
+        for table_ix, table_df in enumerate(tables):
+            if output_file is None:
+                _log.info(f"Saving all CSV tables to {output_csv_path}")
+                output_file = open(output_csv_path, 'w', encoding='utf-8', newline='',
+                                   buffering=CSV_WRITE_BUFFER_SIZE)
+            # Include header only for the first table
+            table_df.reset_index(drop=True).to_csv(output_file, index=False, header=(table_ix == 0))
+            _log.info(f"Added table {table_ix + 1} to CSV.")
+    finally:
+        if output_file is not None:
+            output_file.close()
+
+    if output_file is None:
+        _log.info("No tables found to create a combined CSV file.")
+
+@contextlib.contextmanager
+def open_pdf_mapped(input_doc_path, pages: list[int] | None = None):
+    """
+    Open a PDF with pdfplumber over a read-only memory map of the file, so the
+    parser reads straight from the page cache instead of through read() copies.
+    pages optionally restricts the document to those 1-based page numbers.
+    """
+    with open(input_doc_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with pdfplumber.open(mapped, pages=pages) as pdf:
+            yield pdf
+
+def _iter_page_tables(pdf, start: int = 0, end: int | None = None):
+    """Yield the raw tables of pages [start, end), releasing each page's parsed layout afterwards"""
+    for page_num, page in enumerate(pdf.pages[start:end], start):
+        yield page.extract_tables()
+        page.flush_cache()
+        if (page_num + 1) % PAGE_BATCH_SIZE == 0:
+            gc.collect()
+
+def _extract_page_range(input_doc_path_str: str, start: int, end: int, pages: list[int] | None = None):
+    """Worker for extract_tables_parallel: raw tables for pages [start, end)"""
+    with open_pdf_mapped(input_doc_path_str, pages) as pdf:
+        return list(_iter_page_tables(pdf, start, end))
+
+def extract_tables_parallel(input_doc_path_str: str, n_procs: int | None = None, pages: list[int] | None = None,
+                            page_count: int | None = None):
+    """
+    Extract the raw tables of every page using a pool of worker processes.
+    Returns one list of tables per page, in page order. Pass page_count when
+    the caller already has the document open, to skip opening it to count pages.
+    """
+    if page_count is None:
+        if pages is not None:
+            page_count = len(pages)
+        else:
+            with open_pdf_mapped(input_doc_path_str) as pdf:
+                page_count = len(pdf.pages)
+    if n_procs is None:
+        n_procs = max(1, (os.cpu_count() or 1) - 1)
+    n_procs = max(1, min(n_procs, page_count))
+
+    # Contiguous page ranges, one per worker
+    step = -(-page_count // n_procs) if page_count else 1
+    ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+    page_tables = []
+    with ProcessPoolExecutor(max_workers=n_procs) as executor:
+        futures = [executor.submit(_extract_page_range, input_doc_path_str, start, end, pages) for start, end in ranges]
+        for future in futures:
+            page_tables.extend(future.result())
+    return page_tables
+
+@cached_extraction('pdfplumber')
+def extract_tables_from_file_pdfplumber(input_doc_path_str: str, output_csv_path_str: str | None = None, pages: list[int] | None = None):
+    """
+    Extract tables from a PDF file using improved pdfplumber logic.
+    pages optionally limits extraction to those 1-based page numbers.
     """
     logging.basicConfig(level=logging.INFO)
     
@@ -64,9 +267,14 @@ def extract_tables_from_file_pdfplumber(input_doc_path_str: str, output_csv_path
 
     start_time = time.time()
     all_invoice_lines = []
+    all_tables = []
 
     try:
-        with pdfplumber.open(input_doc_path) as pdf:
+        # Open and parse the document once; the table fallback below reuses the
+        # pages already laid out for text extraction instead of re-parsing them
+        with open_pdf_mapped(input_doc_path, pages) as pdf:
+            # Pages whose parsed layout may still be needed by the table fallback
+            retained_pages = []
             for page_num, page in enumerate(pdf.pages):
                 _log.info(f"Processing page {page_num + 1}")
                 
@@ -78,7 +286,50 @@ def extract_tables_from_file_pdfplumber(input_doc_path_str: str, output_csv_path
                     if page_lines:
                         all_invoice_lines.extend(page_lines)
                         _log.info(f"Found {len(page_lines)} invoice lines on page {page_num + 1}")
-                    
+
+                if all_invoice_lines:
+                    # The table fallback will not run, so drop parsed layouts as we go
+                    for retained_page in retained_pages:
+                        retained_page.flush_cache()
+                    retained_pages.clear()
+                    page.flush_cache()
+                else:
+                    retained_pages.append(page)
+
+                if (page_num + 1) % PAGE_BATCH_SIZE == 0:
+                    gc.collect()
+
+            if not all_invoice_lines:
+                # Fallback to original table extraction if no structured data found
+                _log.info("No structured invoice data found, falling back to table extraction")
+                try:
+                    workers = int(os.environ.get(WORKERS_ENV, '1'))
+                    if workers > 1 and len(pdf.pages) > 1:
+                        # Layouts kept for reuse are not needed when workers re-open the file
+                        for retained_page in retained_pages:
+                            retained_page.flush_cache()
+                        retained_pages.clear()
+                        page_tables = extract_tables_parallel(input_doc_path_str, workers, pages,
+                                                              page_count=len(pdf.pages))
+                    else:
+                        page_tables = _iter_page_tables(pdf)
+
+                    for page_num, tables in enumerate(page_tables):
+                        if tables:
+                            for table_idx, table in enumerate(tables):
+                                if table and len(table) > 1:
+                                    # Convert table to DataFrame
+                                    df = pd.DataFrame(table[1:], columns=table[0] if table[0] else [])
+                                    # Remove empty columns
+                                    df = df.dropna(axis=1, how='all')
+                                    df = df.loc[:, (df != '').any(axis=0)]
+                                    
+                                    if not df.empty and len(df.columns) >= 2:
+                                        all_tables.append(df)
+                                        _log.info(f"Extracted table {table_idx + 1} from page {page_num + 1}")
+                except Exception as e:
+                    _log.error(f"Error extracting tables using pdfplumber: {e}")
+                    return []
     except Exception as e:
         _log.error(f"Error processing PDF: {e}")
         return []
@@ -88,44 +339,19 @@ def extract_tables_from_file_pdfplumber(input_doc_path_str: str, output_csv_path
         _log.info(f"Using structured invoice extraction: {len(all_invoice_lines)} lines found")
         
         # Create DataFrame from invoice lines
-        df = pd.DataFrame(all_invoice_lines)
+        df = pd.DataFrame.from_records(all_invoice_lines, columns=INVOICE_LINE_COLUMNS)
         df = df.sort_values('Line').reset_index(drop=True)
         
         _log.info(f"Extracted structured data with columns: {list(df.columns)}")
         
         # Save to CSV
-        df.to_csv(output_csv_path, index=False)
+        write_tables_to_csv((df,), output_csv_path)
         _log.info(f"Saved structured data to {output_csv_path}")
         
         end_time = time.time() - start_time
         _log.info(f"Document converted and tables exported in {end_time:.2f} seconds.")
         
         return [df]
-    
-    # Fallback to original table extraction if no structured data found
-    _log.info("No structured invoice data found, falling back to table extraction")
-    
-    all_tables = []
-    
-    try:
-        with pdfplumber.open(input_doc_path) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                tables = page.extract_tables()
-                if tables:
-                    for table_idx, table in enumerate(tables):
-                        if table and len(table) > 1:
-                            # Convert table to DataFrame
-                            df = pd.DataFrame(table[1:], columns=table[0] if table[0] else [])
-                            # Remove empty columns
-                            df = df.dropna(axis=1, how='all')
-                            df = df.loc[:, (df != '').any(axis=0)]
-                            
-                            if not df.empty and len(df.columns) >= 2:
-                                all_tables.append(df)
-                                _log.info(f"Extracted table {table_idx + 1} from page {page_num + 1}")
-    except Exception as e:
-        _log.error(f"Error extracting tables using pdfplumber: {e}")
-        return []
 
     if not all_tables:
         _log.warning("No tables found in PDF")
@@ -145,36 +371,15 @@ def extract_tables_from_file_pdfplumber(input_doc_path_str: str, output_csv_path
         df = df.applymap(prevent_csv_injection)
         return df
 
-    all_csv_parts = []
-
     # Export tables
-    for table_ix, table in enumerate(all_tables):
-        table_df = sanitize_df_for_csv(table)
-        
-        # Convert table to CSV string via buffer
-        csv_buffer = io.StringIO()
-        current_table_df_for_csv = table_df.reset_index(drop=True)
-        # Include header only for the first table
-        current_table_df_for_csv.to_csv(csv_buffer, index=False, header=(table_ix == 0))
-        all_csv_parts.append(csv_buffer.getvalue())
-        csv_buffer.close()
-        _log.info(f"Added table {table_ix + 1} to CSV parts.")
-
-    # Save combined CSV file
-    if all_csv_parts:
-        combined_csv_content = "".join(all_csv_parts)
-        # Use the determined output_csv_path
-        _log.info(f"Saving all CSV tables to {output_csv_path}")
-        with open(output_csv_path, 'w', encoding='utf-8') as f:
-            f.write(combined_csv_content)
-    else:
-        _log.info("No tables found to create a combined CSV file.")
+    write_tables_to_csv((sanitize_df_for_csv(table) for table in all_tables), output_csv_path)
 
     end_time = time.time() - start_time
     _log.info(f"Document converted and tables exported in {end_time:.2f} seconds.")
     
     return all_tables if all_tables else []
 
+@cached_extraction('docling')
 def extract_tables_from_file_docling(input_doc_path_str: str, output_csv_path_str: str | None = None):
     """
     Extract tables from a PDF file using docling (memory optimized)
@@ -269,97 +474,88 @@ def extract_tables_from_file_docling(input_doc_path_str: str, output_csv_path_st
         df = df.applymap(prevent_csv_injection)
         return df
 
-    all_csv_parts = []
-
     # Export tables
-    for table_ix, table in enumerate(conv_res.document.tables):
+    for table in conv_res.document.tables:
         table_df: pd.DataFrame = table.export_to_dataframe()
         all_tables.append(table_df)
-        
-        # Convert table to CSV string via buffer
-        csv_buffer = io.StringIO()
-        current_table_df_for_csv = table_df.reset_index(drop=True)
-        # Include header only for the first table
-        current_table_df_for_csv.to_csv(csv_buffer, index=False, header=(table_ix == 0))
-        all_csv_parts.append(csv_buffer.getvalue())
-        csv_buffer.close()
-        _log.info(f"Added table {table_ix + 1} to CSV parts.")
-
-    # Save combined CSV file
-    if all_csv_parts:
-        combined_csv_content = "".join(all_csv_parts)
-        # Use the determined output_csv_path
-        _log.info(f"Saving all CSV tables to {output_csv_path}")
-        with open(output_csv_path, 'w', encoding='utf-8') as f:
-            f.write(combined_csv_content)
-    else:
-        _log.info("No tables found to create a combined CSV file.")
+
+    write_tables_to_csv(all_tables, output_csv_path)
 
     end_time = time.time() - start_time
     _log.info(f"Document converted and tables exported in {end_time:.2f} seconds.")
     
     return all_tables
 
-def extract_tables_from_file(input_doc_path_str: str, output_csv_path_str: str | None = None):
+# docling is disabled in production: it has memory issues and can hang on
+# certain PDFs. Set PDFTOCSV_ENABLE_DOCLING=1 to let the dispatcher pick it.
+# It is only picked on the main thread: its timeout uses SIGALRM, which cannot
+# be installed from the threads a Flask server handles uploads on. It also caps
+# the address space of the whole process (RLIMIT_AS), so do not enable it in a
+# process that serves other requests.
+ENABLE_DOCLING_ENV = 'PDFTOCSV_ENABLE_DOCLING'
+DOCLING_MIN_AVAILABLE_GB = 2.0
+DOCLING_MAX_PAGES = 500
+
+def _select_extraction_method(input_doc_path_str: str, available_memory_gb: float) -> str:
+    """Decide up front which extractor to run, so no engine is loaded only to fail"""
+    if os.environ.get(ENABLE_DOCLING_ENV, '').lower() not in ('1', 'true', 'yes'):
+        return 'pdfplumber'
+    if threading.current_thread() is not threading.main_thread():
+        _log.info("Not on the main thread, using pdfplumber instead of docling")
+        return 'pdfplumber'
+    if available_memory_gb < DOCLING_MIN_AVAILABLE_GB:
+        _log.warning(f"Low memory ({available_memory_gb:.2f} GB available). Using pdfplumber instead of docling.")
+        return 'pdfplumber'
+    if importlib.util.find_spec('docling') is None:
+        _log.info("Docling not available, using pdfplumber for table extraction")
+        return 'pdfplumber'
+    try:
+        with open_pdf_mapped(input_doc_path_str) as pdf:
+            page_count = len(pdf.pages)
+    except Exception as e:
+        _log.warning(f"Could not read page count ({e}), using pdfplumber")
+        return 'pdfplumber'
+    if page_count > DOCLING_MAX_PAGES:
+        _log.warning(f"Large PDF ({page_count} pages). Using pdfplumber instead of docling.")
+        return 'pdfplumber'
+    return 'docling'
+
+EXTRACTION_METHODS = {
+    'pdfplumber': extract_tables_from_file_pdfplumber,
+    'docling': extract_tables_from_file_docling,
+}
+
+def extract_tables_from_file(input_doc_path_str: str, output_csv_path_str: str | None = None, pages: list[int] | None = None):
     """
-    Extract tables from a file with memory-aware fallback strategy.
+    Extract tables from a file with a memory-aware choice of extractor.
     
-    Strategy:
-    1. Try docling first (better accuracy) with memory monitoring
-    2. If docling fails due to memory issues, fallback to pdfplumber
-    3. If both fail, return empty result
+    The method is chosen once, before any extraction starts: pdfplumber unless
+    docling is enabled, installed, running on the main thread, has enough memory
+    and the PDF is not too long. If docling then fails at run time, pdfplumber
+    is used instead.
+    A page selection is only supported by pdfplumber, so it always uses pdfplumber.
     """
     import psutil
-    import gc
     
     # Check available memory before processing
     available_memory_gb = psutil.virtual_memory().available / (1024**3)
     _log.info(f"Available memory: {available_memory_gb:.2f} GB")
     
-    # Always use pdfplumber for production stability
-    # Docling has memory issues and can hang on certain PDFs
-    _log.info(f"Using pdfplumber for reliable PDF processing (available memory: {available_memory_gb:.2f} GB)")
-    return extract_tables_from_file_pdfplumber(input_doc_path_str, output_csv_path_str)
-    
-    # Legacy docling code kept for reference but disabled
-    # TODO: Re-enable docling when memory issues are resolved
-    """
-    # If we have less than 3GB available, skip docling and use pdfplumber
-    if available_memory_gb < 3.0:
-        _log.warning(f"Low memory ({available_memory_gb:.2f} GB available). Using pdfplumber instead of docling.")
-        return extract_tables_from_file_pdfplumber(input_doc_path_str, output_csv_path_str)
+    if pages is not None:
+        _log.info(f"Using pdfplumber for pages {pages} (available memory: {available_memory_gb:.2f} GB)")
+        return extract_tables_from_file_pdfplumber(input_doc_path_str, output_csv_path_str, pages=pages)
     
-    # Check file size - if PDF is too large, use pdfplumber
-    try:
-        file_size_mb = os.path.getsize(input_doc_path_str) / (1024 * 1024)
-        if file_size_mb > 5:  # If PDF is larger than 5MB
-            _log.warning(f"Large PDF file ({file_size_mb:.1f} MB). Using pdfplumber instead of docling.")
-            return extract_tables_from_file_pdfplumber(input_doc_path_str, output_csv_path_str)
-    except:
-        pass
-    """
-    
-    # Try docling first for best results
-    try:
-        _log.info("Attempting docling for PDF table extraction")
-        gc.collect()  # Clean up before heavy operation
-        result = extract_tables_from_file_docling(input_doc_path_str, output_csv_path_str)
-        _log.info("✅ Docling extraction successful")
-        return result
-    except ImportError as e:
-        # Fallback to pdfplumber if docling is not available
-        _log.info(f"Docling not available ({e}), falling back to pdfplumber for table extraction")
-        return extract_tables_from_file_pdfplumber(input_doc_path_str, output_csv_path_str)
-    except (MemoryError, RuntimeError, SystemExit) as e:
-        # Memory-related errors - fallback to pdfplumber
-        _log.warning(f"Docling failed due to memory/system error ({e}), falling back to pdfplumber")
-        gc.collect()  # Clean up memory
-        return extract_tables_from_file_pdfplumber(input_doc_path_str, output_csv_path_str)
-    except Exception as e:
-        # Any other error - fallback to pdfplumber
-        _log.error(f"Docling failed with error ({e}), falling back to pdfplumber")
-        gc.collect()  # Clean up memory
-        return extract_tables_from_file_pdfplumber(input_doc_path_str, output_csv_path_str)
+    method = _select_extraction_method(input_doc_path_str, available_memory_gb)
+    _log.info(f"Using {method} for PDF processing (available memory: {available_memory_gb:.2f} GB)")
+    if method == 'docling':
+        try:
+            return EXTRACTION_METHODS['docling'](input_doc_path_str, output_csv_path_str)
+        except (ImportError, MemoryError, RuntimeError, TimeoutError) as e:
+            # docling's failures at run time (model load, memory, hangs) are
+            # not predictable up front; pdfplumber still gives a result
+            _log.warning(f"Docling failed ({e}), falling back to pdfplumber")
+            gc.collect()
+    return EXTRACTION_METHODS['pdfplumber'](input_doc_path_str, output_csv_path_str)
 
 
 if __name__ == "__main__":
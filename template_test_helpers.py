@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Template lookup helpers shared by the local template test scripts
+(test_template_local.py, test_template_debug.py, test_upload_simulation.py)
+"""
+
+import functools
+import json
+import os
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads  # stdlib fallback; also accepts UTF-8 bytes
+
+# Same directory as app.py
+TEMPLATES_DIR = "templates_storage"
+
+# Maps space, underscore and hyphen to NUL so str.partition can find the first
+# delimiter in a filename without going through the regex engine
+_DELIM_TRANS = str.maketrans(' _-', '\x00\x00\x00')
+
+def extract_template_name(filename):
+    """The part of a filename before its extension and first space, underscore or hyphen"""
+    name_without_extension = filename.rpartition('.')[0] or filename
+    return name_without_extension.translate(_DELIM_TRANS).partition('\x00')[0]
+
+@functools.lru_cache(maxsize=None)
+def load_template(template_path):
+    """Parse a template file, once per path for the life of the process"""
+    with open(template_path, 'rb') as f_tpl:
+        return _json_loads(f_tpl.read())
+
+@functools.lru_cache(maxsize=None)
+def get_sorted_template_files():
+    """
+    Scan TEMPLATES_DIR once and return its .json entries, most specific
+    (longest) name first. .json is always 5 characters, so sorting on the full
+    name length gives the same order as sorting on the base name.
+    """
+    entries = [e for e in os.scandir(TEMPLATES_DIR) if e.name.endswith(".json")]
+    entries.sort(key=lambda e: len(e.name), reverse=True)
+    return tuple(entries)
+
+@functools.lru_cache(maxsize=None)
+def load_template_index():
+    """
+    List and parse the templates in TEMPLATES_DIR once, most specific (longest)
+    name first. Entries are (filename, base_name, base_name_lower, template);
+    template is None when the file could not be loaded.
+    """
+    index = []
+    for entry in get_sorted_template_files():
+        try:
+            template = load_template(entry.path)
+        except Exception as e:
+            print(f"❌ Error loading template {entry.name}: {e}")
+            template = None
+        base_name = entry.name[:-5]
+        index.append((entry.name, base_name, base_name.lower(), template))
+    return tuple(index)
+
+def is_template_match(template_base_name_lower, normalized_template_name):
+    """(is_exact_match, is_prefix_match) with the same rules as app.py"""
+    is_exact_match = template_base_name_lower == normalized_template_name
+    is_prefix_match = template_base_name_lower.startswith(normalized_template_name + "-") or \
+                      normalized_template_name.startswith(template_base_name_lower)
+    return is_exact_match, is_prefix_match
+
+def find_template_match(normalized_template_name):
+    """
+    The index entry app.py would auto-apply for a normalized template name: the
+    most specific exact or prefix match that loaded and has field_mappings.
+    Returns None when no template matches.
+    """
+    for entry in load_template_index():
+        template = entry[3]
+        if template is None or "field_mappings" not in template:
+            continue
+        if any(is_template_match(entry[2], normalized_template_name)):
+            return entry
+    return None
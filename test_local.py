@@ -3,16 +3,23 @@
 Test script to run the application locally with EC2-like Docker configuration
 """
 
+import shlex
 import subprocess
 import sys
-import time
 import requests
 import os
 
+from docker_test_helpers import wait_ready
+
 def run_command(cmd, check=True):
-    """Run a command and return the result"""
-    print(f"Running: {cmd}")
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+    """Run a command and return the result
+
+    ``cmd`` may be an argv list or a string; strings are tokenized with
+    shlex so no intermediate shell is spawned.
+    """
+    args = shlex.split(cmd) if isinstance(cmd, str) else list(cmd)
+    print(f"Running: {shlex.join(args)}")
+    result = subprocess.run(args, capture_output=True, text=True)
     if check and result.returncode != 0:
         print(f"Error: {result.stderr}")
         return False
@@ -43,18 +50,28 @@ def test_docker_setup():
     
     # Step 4: Run container with EC2-like settings
     print("\n4. Running container with EC2-like settings...")
-    docker_cmd = """docker run -d --name vendor-statements-local-test -p 8000:8000 -v $(pwd)/local-test-data/uploads:/app/uploads -v $(pwd)/local-test-data/templates:/app/templates_storage -v $(pwd)/local-test-data/preferences:/app/learned_preferences_storage --memory="4g" --memory-swap="6g" --cpus="2.0" --env-file .env vendor-statements-local"""
+    data_dir = os.path.join(os.getcwd(), "local-test-data")
+    docker_cmd = [
+        "docker", "run", "-d", "--name", "vendor-statements-local-test", "-p", "8000:8000",
+        "-v", f"{data_dir}/uploads:/app/uploads",
+        "-v", f"{data_dir}/templates:/app/templates_storage",
+        "-v", f"{data_dir}/preferences:/app/learned_preferences_storage",
+        "--memory=4g", "--memory-swap=6g", "--cpus=2.0",
+        "--env-file", ".env", "vendor-statements-local",
+    ]
     
     if not run_command(docker_cmd):
         return False
     
     # Step 5: Wait for container to start
     print("\n5. Waiting for container to start...")
-    time.sleep(10)
+    if not wait_ready("http://localhost:8000/health"):
+        print("⚠️  Container did not report healthy within 15 seconds")
     
     # Step 6: Check container status
     print("\n6. Checking container status...")
-    run_command("docker ps | grep vendor-statements-local-test")
+    run_command(["docker", "ps", "--filter", "name=vendor-statements-local-test",
+                 "--format", "{{.Names}}"])
     
     # Step 7: Check logs
     print("\n7. Checking container logs...")
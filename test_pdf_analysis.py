@@ -5,6 +5,20 @@ Analyze the PDF structure to understand what we're dealing with
 import pdfplumber
 import re
 
+# Patterns that might indicate invoice data, compiled once and paired with
+# the source text used as their label in the report
+INVOICE_PATTERNS = [
+    (re.compile(p, re.IGNORECASE), p) for p in [
+        r'\d{2}/\d{2}/\d{2,4}',  # Dates
+        r'\d+\.\d{2}',           # Amounts
+        r'INVOICE',              # Invoice keyword
+        r'\d{8,}',               # Long numbers (invoice numbers)
+    ]
+]
+
+# Lines that look like invoice items
+INVOICE_LINE_RE = re.compile(r'^\s*\d+\s+\d{2}/\d{2}/\d{2,4}\s+.*?\s+\d+\.\d{2}\s*$')
+
 def analyze_pdf_structure(pdf_path):
     """Analyze PDF to understand its structure"""
     print(f"🔍 Analyzing PDF: {pdf_path}")
@@ -31,17 +45,10 @@ def analyze_pdf_structure(pdf_path):
             print(f"  {i+1:2d}: {repr(line)}")
         
         # Look for patterns that might be invoice lines
-        invoice_patterns = [
-            r'\d{2}/\d{2}/\d{2,4}',  # Dates
-            r'\d+\.\d{2}',           # Amounts
-            r'INVOICE',              # Invoice keyword
-            r'\d{8,}',               # Long numbers (invoice numbers)
-        ]
-        
         print(f"\n🔍 Pattern Analysis:")
-        for pattern in invoice_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            print(f"  - {pattern}: {len(matches)} matches")
+        for rx, label in INVOICE_PATTERNS:
+            matches = rx.findall(text)
+            print(f"  - {label}: {len(matches)} matches")
             if matches:
                 print(f"    Examples: {matches[:5]}")
         
@@ -64,10 +71,9 @@ def analyze_pdf_structure(pdf_path):
         print(f"\n🎯 Looking for structured data patterns:")
         
         # Check if there are lines that look like invoice items
-        invoice_line_pattern = r'^\s*\d+\s+\d{2}/\d{2}/\d{2,4}\s+.*?\s+\d+\.\d{2}\s*$'
         invoice_lines = []
         for line in lines:
-            if re.match(invoice_line_pattern, line):
+            if INVOICE_LINE_RE.match(line):
                 invoice_lines.append(line)
         
         print(f"  - Potential invoice lines: {len(invoice_lines)}")
@@ -3,17 +3,30 @@
 Test PDF processing in Docker with EC2-like constraints
 """
 
+import shlex
 import subprocess
 import sys
-import time
+import threading
 import requests
 import os
 import json
 
+from docker_test_helpers import wait_ready
+
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None  # fall back to building the multipart body in memory
+
 def run_command(cmd, check=True):
-    """Run a command and return the result"""
-    print(f"Running: {cmd}")
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+    """Run a command and return the result
+
+    ``cmd`` may be an argv list or a string; strings are tokenized with
+    shlex so no intermediate shell is spawned.
+    """
+    args = shlex.split(cmd) if isinstance(cmd, str) else list(cmd)
+    print(f"Running: {shlex.join(args)}")
+    result = subprocess.run(args, capture_output=True, text=True)
     if check and result.returncode != 0:
         print(f"Error: {result.stderr}")
         return False
@@ -21,6 +34,46 @@ def run_command(cmd, check=True):
         print(f"Output: {result.stdout}")
     return True
 
+def _start_stats_watch(name):
+    """Stream `docker stats` for a container into a list from a background thread"""
+    samples = []
+    proc = subprocess.Popen(["docker", "stats", "--format", "{{json .}}", name],
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+
+    def _reader():
+        for line in proc.stdout:
+            # The streaming output prefixes each frame with terminal control codes
+            start = line.find("{")
+            if start == -1:
+                continue
+            try:
+                samples.append(json.loads(line[start:]))
+            except ValueError:
+                pass
+
+    thread = threading.Thread(target=_reader, daemon=True)
+    thread.start()
+    return proc, thread, samples
+
+def _stop_stats_watch(proc, thread, samples):
+    """Stop the stats stream and print before/peak/after usage"""
+    proc.terminate()
+    thread.join(timeout=5)
+    if not samples:
+        print("⚠️  No docker stats samples collected")
+        return
+
+    def percent(sample, key):
+        try:
+            return float(sample.get(key, "0").rstrip("%"))
+        except ValueError:
+            return 0.0
+
+    peak = max(samples, key=lambda sample: percent(sample, "MemPerc"))
+    for label, sample in (("Before", samples[0]), ("Peak", peak), ("After", samples[-1])):
+        print(f"  - {label}: CPU {sample.get('CPUPerc')}, Memory {sample.get('MemUsage')} ({sample.get('MemPerc')})")
+    print(f"  - Peak CPU: {max(percent(sample, 'CPUPerc') for sample in samples):.2f}% over {len(samples)} samples")
+
 def test_pdf_upload_docker():
     """Test PDF upload in Docker environment"""
     
@@ -40,13 +93,16 @@ def test_pdf_upload_docker():
     
     # Step 1: Ensure Docker container is running
     print("\n1. Checking Docker container status...")
-    result = subprocess.run("docker ps | grep vendor-statements-local-test", shell=True, capture_output=True, text=True)
-    if result.returncode != 0:
+    result = subprocess.run(
+        ["docker", "ps", "--filter", "name=vendor-statements-local-test", "--format", "{{.Names}}"],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0 or not result.stdout.strip():
         print("⚠️  Container not running. Starting it...")
         if not run_command("docker start vendor-statements-local-test", check=False):
             print("❌ Failed to start container. Please run ./test_docker_local.sh first")
             return False
-        time.sleep(10)
+        wait_ready("http://localhost:8000/health")
     
     # Step 2: Check container health
     print("\n2. Checking container health...")
@@ -62,18 +118,26 @@ def test_pdf_upload_docker():
         print(f"❌ Health check failed: {e}")
         return False
     
-    # Step 3: Monitor container resources before upload
+    # Step 3: Monitor container resources for the duration of the upload
     print("\n3. Monitoring container resources...")
-    run_command("docker stats vendor-statements-local-test --no-stream")
+    stats_watch = _start_stats_watch("vendor-statements-local-test")
     
     # Step 4: Test PDF upload
     print("\n4. Testing PDF upload...")
     try:
         print("📤 Uploading PDF file...")
         with open(pdf_file, "rb") as f:
-            files = {"files[]": f}
             # Increase timeout for PDF processing
-            response = requests.post("http://localhost:8000/upload", files=files, timeout=180)
+            if MultipartEncoder is not None:
+                # Stream the file in chunks instead of building the whole body in memory
+                encoder = MultipartEncoder(
+                    fields={"files[]": (os.path.basename(pdf_file), f, "application/pdf")}
+                )
+                response = requests.post("http://localhost:8000/upload", data=encoder,
+                                         headers={"Content-Type": encoder.content_type}, timeout=180)
+            else:
+                files = {"files[]": f}
+                response = requests.post("http://localhost:8000/upload", files=files, timeout=180)
         
         if response.status_code == 200:
             print("✅ PDF upload successful!")
@@ -106,15 +170,14 @@ def test_pdf_upload_docker():
     except Exception as e:
         print(f"❌ PDF upload failed: {e}")
         return False
+    finally:
+        print("\n📈 Container resources during upload:")
+        _stop_stats_watch(*stats_watch)
     
     # Step 5: Check container logs for errors
     print("\n5. Checking container logs for errors...")
     run_command("docker logs vendor-statements-local-test --tail 20")
     
-    # Step 6: Monitor container resources after upload
-    print("\n6. Monitoring container resources after upload...")
-    run_command("docker stats vendor-statements-local-test --no-stream")
-    
     return True
 
 def test_pdf_processing_methods():
@@ -130,74 +193,15 @@ def test_pdf_processing_methods():
     if not run_command(copy_cmd):
         return False
     
-    # Test pdfplumber method
-    print("\n🧪 Testing pdfplumber method...")
-    pdfplumber_cmd = """docker exec vendor-statements-local-test python -c "
-import sys
-sys.path.append('/app')
-from pdftocsv import extract_tables_from_file_pdfplumber
-import psutil
-import gc
-
-print('Memory before:', psutil.virtual_memory().available / 1024 / 1024 / 1024, 'GB')
-try:
-    result = extract_tables_from_file_pdfplumber('/app/test_hdsupply.pdf', '/app/test_pdfplumber_output.csv')
-    print('pdfplumber result:', len(result) if result else 0, 'tables')
-    print('Memory after:', psutil.virtual_memory().available / 1024 / 1024 / 1024, 'GB')
-except Exception as e:
-    print('pdfplumber error:', str(e))
-"
-"""
-    run_command(pdfplumber_cmd, check=False)
-    
-    # Test docling method (if memory allows)
-    print("\n🧪 Testing docling method...")
-    docling_cmd = """docker exec vendor-statements-local-test python -c "
-import sys
-sys.path.append('/app')
-from pdftocsv import extract_tables_from_file_docling
-import psutil
-import gc
-
-available_gb = psutil.virtual_memory().available / 1024 / 1024 / 1024
-print('Memory available:', available_gb, 'GB')
-
-if available_gb < 2.0:
-    print('Skipping docling - insufficient memory')
-else:
-    try:
-        print('Starting docling processing...')
-        result = extract_tables_from_file_docling('/app/test_hdsupply.pdf', '/app/test_docling_output.csv')
-        print('docling result:', len(result) if result else 0, 'tables')
-        print('Memory after:', psutil.virtual_memory().available / 1024 / 1024 / 1024, 'GB')
-    except Exception as e:
-        print('docling error:', str(e))
-        import traceback
-        traceback.print_exc()
-"
-"""
-    run_command(docling_cmd, check=False)
+    # Copy the method runner once and exercise every method in one interpreter
+    print("📋 Copying method runner to container...")
+    runner = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_pdf_methods.py")
+    if not run_command(["docker", "cp", runner, "vendor-statements-local-test:/app/test_pdf_methods.py"]):
+        return False
     
-    # Test smart fallback method
-    print("\n🧪 Testing smart fallback method...")
-    smart_cmd = """docker exec vendor-statements-local-test python -c "
-import sys
-sys.path.append('/app')
-from pdftocsv import extract_tables_from_file
-import psutil
-
-print('Memory before:', psutil.virtual_memory().available / 1024 / 1024 / 1024, 'GB')
-try:
-    result = extract_tables_from_file('/app/test_hdsupply.pdf', '/app/test_smart_output.csv')
-    print('Smart fallback result:', len(result) if result else 0, 'tables')
-    print('Memory after:', psutil.virtual_memory().available / 1024 / 1024 / 1024, 'GB')
-except Exception as e:
-    print('Smart fallback error:', str(e))
-    import traceback
-    traceback.print_exc()
-"
-"""
-    run_command(smart_cmd, check=False)
+    print("\n🧪 Running PDF processing methods...")
+    run_command(["docker", "exec", "vendor-statements-local-test",
+                 "python", "/app/test_pdf_methods.py", "--method", "all"], check=False)
 
 if __name__ == "__main__":
     print("🧪 PDF Docker Testing Suite")
@@ -2,20 +2,45 @@
 """
 Test PDF processing memory usage and optimization
 """
+import logging
 import os
 import sys
 import psutil
 import gc
+import time
 from pathlib import Path
 
+# Tracebacks are logged at DEBUG; run with LOGLEVEL=DEBUG to see them
+logging.basicConfig(level=os.environ.get('LOGLEVEL', 'INFO'))
+LOG = logging.getLogger(__name__)
+
+PROCESS = psutil.Process()
+
+# In CI only the pdfplumber path is exercised: docling needs ML weights and
+# the smart fallback resolves to pdfplumber anyway
+CI_QUICK = bool(os.environ.get('CI'))
+
+# FAST_TEST=1 only parses the first few pages; unset for full validation
+PAGES_TO_TEST = [1, 2, 3] if os.environ.get('FAST_TEST') == '1' else None
+
+# (label, timestamp, rss bytes, available bytes) samples, reported at the end
+MEMLOG = []
+
 def monitor_memory(label):
-    """Monitor memory usage"""
-    process = psutil.Process()
-    memory_mb = process.memory_info().rss / 1024 / 1024
-    system_memory = psutil.virtual_memory()
-    available_gb = system_memory.available / 1024 / 1024 / 1024
-    print(f"{label}: Process={memory_mb:.1f}MB, Available={available_gb:.1f}GB")
-    return memory_mb
+    """Record a memory sample for the summary printed by print_memory_log()"""
+    rss = PROCESS.memory_info().rss
+    MEMLOG.append((label, time.time(), rss, psutil.virtual_memory().available))
+    return rss / 1024 / 1024
+
+def print_memory_log():
+    """Print all recorded memory samples as one table"""
+    if not MEMLOG:
+        return
+    print("\n📈 Memory samples")
+    print(f"{'Label':<24}{'Elapsed':>10}{'Process':>12}{'Available':>12}")
+    start = MEMLOG[0][1]
+    for label, timestamp, rss, available in MEMLOG:
+        print(f"{label:<24}{timestamp - start:>9.1f}s{rss / 1024 / 1024:>10.1f}MB{available / 1024 / 1024 / 1024:>10.1f}GB")
 
 def test_pdf_processing_methods():
     """Test different PDF processing methods"""
@@ -41,6 +66,8 @@ def test_pdf_processing_methods():
     print(f"📊 File size: {file_size:.2f} MB")
     
     monitor_memory("Initial")
+    pdfplumber_ok = False
+    skipped = []
     
     # Test 1: pdfplumber (lightweight)
     print("\n🔬 Test 1: pdfplumber method")
@@ -49,8 +76,9 @@ def test_pdf_processing_methods():
         gc.collect()
         monitor_memory("Before pdfplumber")
         
-        result = extract_tables_from_file_pdfplumber(test_file, "test_pdfplumber.csv")
+        result = extract_tables_from_file_pdfplumber(test_file, "test_pdfplumber.csv", pages=PAGES_TO_TEST)
         monitor_memory("After pdfplumber")
+        pdfplumber_ok = True
         
         if result:
             print(f"✅ pdfplumber: Success - {len(result)} tables extracted")
@@ -65,54 +93,64 @@ def test_pdf_processing_methods():
     
     # Test 2: docling (memory-intensive)
     print("\n🔬 Test 2: docling method")
-    try:
-        from pdftocsv import extract_tables_from_file_docling
-        gc.collect()
-        monitor_memory("Before docling")
+    if CI_QUICK:
+        print("⏭️  Skipping docling (CI quick mode)")
+        skipped.append("docling")
+    else:
+        try:
+            gc.collect()
         
-        # Check available memory before attempting docling
-        available_gb = psutil.virtual_memory().available / 1024 / 1024 / 1024
-        if available_gb < 2.0:
-            print(f"⚠️  Skipping docling test - insufficient memory ({available_gb:.1f}GB available)")
-        else:
-            result = extract_tables_from_file_docling(test_file, "test_docling.csv")
-            monitor_memory("After docling")
-            
-            if result:
-                print(f"✅ docling: Success - {len(result)} tables extracted")
+            # Check available memory before touching the docling code path at all
+            available_gb = psutil.virtual_memory().available / 1024 / 1024 / 1024
+            if available_gb < 2.0:
+                print(f"⚠️  Skipping docling test - insufficient memory ({available_gb:.1f}GB available)")
             else:
-                print("⚠️  docling: No tables found")
+                from pdftocsv import extract_tables_from_file_docling
+                monitor_memory("Before docling")
+            
+                result = extract_tables_from_file_docling(test_file, "test_docling.csv")
+                monitor_memory("After docling")
+            
+                if result:
+                    print(f"✅ docling: Success - {len(result)} tables extracted")
+                else:
+                    print("⚠️  docling: No tables found")
         
-        gc.collect()
-        monitor_memory("After cleanup")
+            gc.collect()
+            monitor_memory("After cleanup")
         
-    except Exception as e:
-        print(f"❌ docling failed: {e}")
-        import traceback
-        traceback.print_exc()
+        except Exception as e:
+            print(f"❌ docling failed: {e}")
+            LOG.debug("Traceback for the failure above", exc_info=True)
     
     # Test 3: Smart fallback method
     print("\n🔬 Test 3: Smart fallback method")
-    try:
-        from pdftocsv import extract_tables_from_file
-        gc.collect()
-        monitor_memory("Before smart fallback")
+    if CI_QUICK and pdfplumber_ok:
+        print("⏭️  Skipping smart fallback (already covered by the pdfplumber test)")
+        skipped.append("smart fallback")
+    else:
+        try:
+            from pdftocsv import extract_tables_from_file
+            gc.collect()
+            monitor_memory("Before smart fallback")
         
-        result = extract_tables_from_file(test_file, "test_smart.csv")
-        monitor_memory("After smart fallback")
+            result = extract_tables_from_file(test_file, "test_smart.csv", pages=PAGES_TO_TEST)
+            monitor_memory("After smart fallback")
         
-        if result:
-            print(f"✅ Smart fallback: Success - {len(result)} tables extracted")
-        else:
-            print("⚠️  Smart fallback: No tables found")
+            if result:
+                print(f"✅ Smart fallback: Success - {len(result)} tables extracted")
+            else:
+                print("⚠️  Smart fallback: No tables found")
         
-        gc.collect()
-        monitor_memory("After cleanup")
+            gc.collect()
+            monitor_memory("After cleanup")
         
-    except Exception as e:
-        print(f"❌ Smart fallback failed: {e}")
-        import traceback
-        traceback.print_exc()
+        except Exception as e:
+            print(f"❌ Smart fallback failed: {e}")
+            LOG.debug("Traceback for the failure above", exc_info=True)
+    
+    if skipped:
+        print(f"\n⏭️  Skipped methods: {', '.join(skipped)}")
     
     return True
 
@@ -153,6 +191,7 @@ if __name__ == "__main__":
     
     # Test PDF processing
     success = test_pdf_processing_methods()
+    print_memory_log()
     
     if success:
         print("\n🎉 PDF testing completed!")
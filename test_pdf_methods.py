@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Run the pdftocsv extraction methods inside the Docker container
+
+test_pdf_docker.py copies this script into the container once and runs it
+with --method, so pdfplumber/pandas and friends are imported a single time
+when all methods are exercised together.
+"""
+import argparse
+import gc
+import logging
+import os
+import subprocess
+import sys
+
+# Tracebacks are logged at DEBUG; run with LOGLEVEL=DEBUG to see them
+logging.basicConfig(level=os.environ.get('LOGLEVEL', 'INFO'))
+LOG = logging.getLogger(__name__)
+
+sys.path.append('/app')
+
+DEFAULT_PDF = '/app/test_hdsupply.pdf'
+
+# docling pulls in torch/transformers (~500MB resident), so skip it below this
+DOCLING_MIN_GB = 2.0
+
+def _avail():
+    """Available system memory in bytes, read from /proc/meminfo
+
+    The container is always Linux, so reading the MemAvailable line directly
+    avoids importing psutil (and depending on it being installed).
+    """
+    with open('/proc/meminfo', 'rb') as f:
+        for line in f:
+            if line.startswith(b'MemAvailable:'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+def available_gb():
+    """Available system memory in GB"""
+    return _avail() / 1024 / 1024 / 1024
+
+def run_pdfplumber(pdf_path):
+    """Extract tables with pdfplumber"""
+    from pdftocsv import extract_tables_from_file_pdfplumber
+
+    print('Memory before:', available_gb(), 'GB')
+    try:
+        result = extract_tables_from_file_pdfplumber(pdf_path, '/app/test_pdfplumber_output.csv')
+        print('pdfplumber result:', len(result) if result else 0, 'tables')
+        print('Memory after:', available_gb(), 'GB')
+    except Exception as e:
+        print('pdfplumber error:', str(e))
+
+def run_docling(pdf_path):
+    """Extract tables with docling, if enough memory is available"""
+    from pdftocsv import extract_tables_from_file_docling
+
+    available = available_gb()
+    print('Memory available:', available, 'GB')
+
+    if available < DOCLING_MIN_GB:
+        print('Skipping docling - insufficient memory')
+        return
+    try:
+        print('Starting docling processing...')
+        result = extract_tables_from_file_docling(pdf_path, '/app/test_docling_output.csv')
+        print('docling result:', len(result) if result else 0, 'tables')
+        print('Memory after:', available_gb(), 'GB')
+    except Exception as e:
+        print('docling error:', str(e))
+        LOG.debug('Traceback for the failure above', exc_info=True)
+
+def run_smart(pdf_path):
+    """Extract tables with the smart fallback used by the app"""
+    from pdftocsv import extract_tables_from_file
+
+    print('Memory before:', available_gb(), 'GB')
+    try:
+        result = extract_tables_from_file(pdf_path, '/app/test_smart_output.csv')
+        print('Smart fallback result:', len(result) if result else 0, 'tables')
+        print('Memory after:', available_gb(), 'GB')
+    except Exception as e:
+        print('Smart fallback error:', str(e))
+        LOG.debug('Traceback for the failure above', exc_info=True)
+
+def run_docling_isolated(pdf_path):
+    """Run the docling check in a child interpreter
+
+    CPython does not hand the memory of the loaded torch/docling modules back
+    to the OS, so running docling in-process would inflate every reading taken
+    after it. The child exits and takes that memory with it.
+    """
+    if available_gb() < DOCLING_MIN_GB:
+        print('Skipping docling - insufficient memory')
+        return
+    sys.stdout.flush()
+    subprocess.run([sys.executable, __file__, '--method', 'docling', '--pdf', pdf_path])
+
+METHODS = {
+    'pdfplumber': run_pdfplumber,
+    'docling': run_docling,
+    'smart': run_smart,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--method', choices=[*METHODS, 'all'], default='all')
+    parser.add_argument('--pdf', default=DEFAULT_PDF)
+    args = parser.parse_args()
+
+    names = list(METHODS) if args.method == 'all' else [args.method]
+    for name in names:
+        print(f'\n🧪 Testing {name} method...')
+        if name == 'docling' and len(names) > 1:
+            run_docling_isolated(args.pdf)
+        else:
+            METHODS[name](args.pdf)
+        # Release what the previous method left behind so the next
+        # memory reading reflects only that method
+        gc.collect()
+
+if __name__ == '__main__':
+    main()
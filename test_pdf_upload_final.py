@@ -3,14 +3,88 @@
 Final test of PDF upload with the fixed implementation
 """
 
+import asyncio
+import io
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import os
 
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None  # fall back to building the multipart body in memory
+
+try:
+    import httpx
+except ImportError:
+    httpx = None  # concurrent uploads fall back to a thread pool on SESSION
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+PDF_FILE = "/Users/gaurav/Desktop/Code/vendor-statements/uploads/HDSupply.pdf"
+
+# Read the test PDF once; uploads post it from memory instead of reopening the file
+PDF_BYTES = open(PDF_FILE, "rb").read() if os.path.exists(PDF_FILE) else None
+
+# Shared session so repeated requests reuse pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# UPLOAD_CONCURRENCY=N submits N uploads at once to measure server throughput
+UPLOAD_CONCURRENCY = int(os.environ.get("UPLOAD_CONCURRENCY", "1"))
+
+async def _upload_all_async(count):
+    """Post the test PDF ``count`` times concurrently over one httpx client"""
+    async with httpx.AsyncClient(timeout=180) as client:
+        async def upload():
+            files = {"files[]": ("HDSupply.pdf", PDF_BYTES, "application/pdf")}
+            return await client.post("http://localhost:8000/upload", files=files)
+        return await asyncio.gather(*(upload() for _ in range(count)))
+
+def _upload_all_threaded(count):
+    """Post the test PDF ``count`` times concurrently from a thread pool"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    def upload(_):
+        files = {"files[]": ("HDSupply.pdf", io.BytesIO(PDF_BYTES))}
+        return SESSION.post("http://localhost:8000/upload", files=files, timeout=180)
+
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return list(pool.map(upload, range(count)))
+
+def test_concurrent_uploads(count=UPLOAD_CONCURRENCY):
+    """Submit several uploads at once and report overall throughput"""
+    if PDF_BYTES is None:
+        print(f"❌ PDF file not found: {PDF_FILE}")
+        return False
+    
+    print(f"\n🧪 Testing {count} concurrent PDF uploads")
+    print("=" * 50)
+    start_time = time.time()
+    try:
+        if httpx is not None:
+            if uvloop is not None:
+                uvloop.install()
+            responses = asyncio.run(_upload_all_async(count))
+        else:
+            responses = _upload_all_threaded(count)
+    except Exception as e:
+        print(f"❌ Concurrent uploads failed: {e}")
+        return False
+    elapsed = time.time() - start_time
+    
+    ok = sum(1 for response in responses if response.status_code == 200)
+    print(f"📊 {ok}/{count} uploads succeeded in {elapsed:.1f}s ({count / elapsed:.2f} uploads/s)")
+    return ok == count
+
 def test_pdf_upload():
     """Test PDF upload with the HDSupply.pdf file"""
     
-    pdf_file = "/Users/gaurav/Desktop/Code/vendor-statements/uploads/HDSupply.pdf"
+    pdf_file = PDF_FILE
     
     if not os.path.exists(pdf_file):
         print(f"❌ PDF file not found: {pdf_file}")
@@ -25,9 +99,16 @@ def test_pdf_upload():
         print("📤 Uploading PDF file...")
         start_time = time.time()
         
-        with open(pdf_file, "rb") as f:
-            files = {"files[]": f}
-            response = requests.post("http://localhost:8000/upload", files=files, timeout=60)
+        if MultipartEncoder is not None:
+            # Stream the multipart body in chunks instead of assembling a second copy
+            encoder = MultipartEncoder(
+                fields={"files[]": ("HDSupply.pdf", io.BytesIO(PDF_BYTES), "application/pdf")}
+            )
+            response = SESSION.post("http://localhost:8000/upload", data=encoder,
+                                    headers={"Content-Type": encoder.content_type}, timeout=60)
+        else:
+            files = {"files[]": ("HDSupply.pdf", io.BytesIO(PDF_BYTES))}
+            response = SESSION.post("http://localhost:8000/upload", files=files, timeout=60)
         
         end_time = time.time()
         processing_time = end_time - start_time
@@ -76,6 +157,8 @@ def test_pdf_upload():
 
 if __name__ == "__main__":
     success = test_pdf_upload()
+    if success and UPLOAD_CONCURRENCY > 1:
+        success = test_concurrent_uploads()
     
     if success:
         print("\n🎉 PDF processing is now working!")
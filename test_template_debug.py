@@ -3,15 +3,32 @@
 Debug template auto-application by testing the exact logic from app.py
 """
 
+import contextlib
+import functools
+import io
 import os
-import json
-import re
+import sys
 import tempfile
 import csv
 
-# Constants from app.py
-TEMPLATES_DIR = "templates_storage"
+from template_test_helpers import (
+    TEMPLATES_DIR, extract_template_name, find_template_match,
+    is_template_match, load_template_index
+)
 
+def _buffered_output(func):
+    """Collect everything a test prints and write it to stdout in one call"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        buffer = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(buffer):
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout.write(buffer.getvalue())
+    return wrapper
+
+@_buffered_output
 def test_template_logic_step_by_step():
     """Test each step of the template logic to find where it might be failing."""
     
@@ -25,16 +42,12 @@ def test_template_logic_step_by_step():
     # Step 1: Extract Template Name (Enhanced Logic)
     template_name_from_file = ""
     if original_filename_for_vendor:
-        name_without_extension = os.path.splitext(original_filename_for_vendor)[0]
+        name_without_extension = original_filename_for_vendor.rpartition('.')[0] or original_filename_for_vendor
         print(f"   Name without extension: '{name_without_extension}'")
         
         # Split by the first occurrence of space, underscore, or hyphen
-        parts = re.split(r'[ _-]', name_without_extension, 1)
-        print(f"   Split parts: {parts}")
-        
-        if parts: 
-            template_name_from_file = parts[0]
-            print(f"   ✅ Extracted template name: '{template_name_from_file}'")
+        template_name_from_file = extract_template_name(original_filename_for_vendor)
+        print(f"   ✅ Extracted template name: '{template_name_from_file}'")
     
     # Step 2: Check if templates directory exists
     print(f"\n🔍 Checking templates directory: {TEMPLATES_DIR}")
@@ -45,12 +58,9 @@ def test_template_logic_step_by_step():
         all_files = os.listdir(TEMPLATES_DIR)
         print(f"   📁 All files: {all_files}")
         
-        # Filter JSON files
-        template_files = [f for f in all_files if f.endswith(".json")]
-        print(f"   📄 JSON files: {template_files}")
-        
-        # Sort by specificity
-        template_files.sort(key=lambda x: len(os.path.splitext(x)[0]), reverse=True)
+        # JSON templates, parsed once and sorted by specificity
+        template_index = load_template_index()
+        template_files = [entry[0] for entry in template_index]
         print(f"   📋 Sorted templates: {template_files}")
         
     else:
@@ -59,23 +69,18 @@ def test_template_logic_step_by_step():
     
     # Step 3: Enhanced Template Search and Auto-Apply Logic
     template_applied_data = None
-    if template_name_from_file and os.path.exists(TEMPLATES_DIR):
+    if template_name_from_file:
         print(f"\n🔍 Searching for template matching: '{template_name_from_file}'")
         normalized_template_name = template_name_from_file.lower()
         print(f"   Normalized name: '{normalized_template_name}'")
         
-        for template_file_in_storage in template_files:
-            template_base_name = os.path.splitext(template_file_in_storage)[0]
-            template_base_name_lower = template_base_name.lower()
-            
+        for template_file_in_storage, template_base_name, template_base_name_lower, loaded_template in template_index:
             print(f"\\n   🔍 Checking template: {template_file_in_storage}")
             print(f"      Base name: '{template_base_name}'")
             print(f"      Lower case: '{template_base_name_lower}'")
             
             # Enhanced matching: exact match or starts with
-            is_exact_match = template_base_name_lower == normalized_template_name
-            is_prefix_match = template_base_name_lower.startswith(normalized_template_name + "-") or \
-                            normalized_template_name.startswith(template_base_name_lower)
+            is_exact_match, is_prefix_match = is_template_match(template_base_name_lower, normalized_template_name)
             
             print(f"      Exact match: {is_exact_match}")
             print(f"      Prefix match: {is_prefix_match}")
@@ -83,51 +88,45 @@ def test_template_logic_step_by_step():
             if is_exact_match or is_prefix_match:
                 print(f"      ✅ MATCH FOUND!")
                 
-                try:
-                    template_path = os.path.join(TEMPLATES_DIR, template_file_in_storage)
-                    print(f"      📂 Loading template from: {template_path}")
+                template_path = os.path.join(TEMPLATES_DIR, template_file_in_storage)
+                print(f"      📂 Template loaded from: {template_path}")
+                
+                if loaded_template is None:
+                    continue
+                
+                print(f"      📋 Template keys: {list(loaded_template.keys())}")
+                
+                if "field_mappings" in loaded_template: # Basic validation
+                    template_applied_data = loaded_template
+                    current_skip_rows_for_extraction = loaded_template.get("skip_rows", 0)
+                    
+                    # Simulate results_entry updates
+                    applied_template_name = loaded_template.get("template_name", template_base_name)
+                    applied_template_filename = template_file_in_storage
                     
-                    with open(template_path, 'r', encoding='utf-8') as f_tpl:
-                        loaded_template = json.load(f_tpl)
+                    match_type = "exact" if is_exact_match else "prefix"
+                    print(f"      🎯 Template '{applied_template_name}' would be auto-applied ({match_type} match)")
+                    print(f"      📊 Skip rows: {current_skip_rows_for_extraction}")
+                    print(f"      📋 Field mappings: {len(loaded_template.get('field_mappings', []))}")
                     
-                    print(f"      📋 Template keys: {list(loaded_template.keys())}")
+                    # Show what the success message would be
+                    success_message = f"🎯 Template '{applied_template_name}' auto-applied (matched first word '{template_name_from_file}') with {current_skip_rows_for_extraction} skip rows."
+                    print(f"      💬 Success message: {success_message}")
                     
-                    if "field_mappings" in loaded_template: # Basic validation
-                        template_applied_data = loaded_template
-                        current_skip_rows_for_extraction = loaded_template.get("skip_rows", 0)
-                        
-                        # Simulate results_entry updates
-                        applied_template_name = loaded_template.get("template_name", template_base_name)
-                        applied_template_filename = template_file_in_storage
-                        
-                        match_type = "exact" if is_exact_match else "prefix"
-                        print(f"      🎯 Template '{applied_template_name}' would be auto-applied ({match_type} match)")
-                        print(f"      📊 Skip rows: {current_skip_rows_for_extraction}")
-                        print(f"      📋 Field mappings: {len(loaded_template.get('field_mappings', []))}")
-                        
-                        # Show what the success message would be
-                        success_message = f"🎯 Template '{applied_template_name}' auto-applied (matched first word '{template_name_from_file}') with {current_skip_rows_for_extraction} skip rows."
-                        print(f"      💬 Success message: {success_message}")
-                        
-                        break # Stop searching once a template is found
-                    else:
-                        print(f"      ❌ Template missing 'field_mappings' key")
-                        
-                except Exception as e_tpl_load:
-                    print(f"      ❌ Error loading template {template_file_in_storage}: {e_tpl_load}")
+                    break # Stop searching once a template is found
+                else:
+                    print(f"      ❌ Template missing 'field_mappings' key")
         
         if not template_applied_data:
             print(f"\\n   ❌ No template found for '{template_name_from_file}'")
-            available_templates = [os.path.splitext(f)[0] for f in template_files]
+            available_templates = [entry[1] for entry in template_index]
             print(f"   📋 Available templates: {available_templates}")
     else:
-        if not template_name_from_file:
-            print(f"\\n   ❌ No template name extracted from filename")
-        else:
-            print(f"\\n   ❌ Templates directory not found")
+        print(f"\\n   ❌ No template name extracted from filename")
     
     return template_applied_data is not None
 
+@_buffered_output
 def test_multiple_filenames():
     """Test multiple filename patterns."""
     
@@ -145,6 +144,7 @@ def test_multiple_filenames():
     ]
     
     results = []
+    templates_dir_exists = os.path.isdir(TEMPLATES_DIR)
     
     for filename in test_filenames:
         print(f"\\n📄 Testing: {filename}")
@@ -152,42 +152,24 @@ def test_multiple_filenames():
         # Extract template name
         template_name_from_file = ""
         if filename:
-            name_without_extension = os.path.splitext(filename)[0]
-            parts = re.split(r'[ _-]', name_without_extension, 1)
-            if parts: 
-                template_name_from_file = parts[0]
+            template_name_from_file = extract_template_name(filename)
         
         # Check for template match
         template_found = False
-        if template_name_from_file and os.path.exists(TEMPLATES_DIR):
+        if template_name_from_file and templates_dir_exists:
             normalized_template_name = template_name_from_file.lower()
-            template_files = [f for f in os.listdir(TEMPLATES_DIR) if f.endswith(".json")]
-            template_files.sort(key=lambda x: len(os.path.splitext(x)[0]), reverse=True)
             
-            for template_file_in_storage in template_files:
-                template_base_name = os.path.splitext(template_file_in_storage)[0]
-                template_base_name_lower = template_base_name.lower()
-                
-                is_exact_match = template_base_name_lower == normalized_template_name
-                is_prefix_match = template_base_name_lower.startswith(normalized_template_name + "-") or \
-                                normalized_template_name.startswith(template_base_name_lower)
+            # Same specificity-ordered scan as app.py; the first usable match wins
+            match = find_template_match(normalized_template_name)
+            
+            if match is not None:
+                _, template_base_name, template_base_name_lower, loaded_template = match
+                template_found = True
+                match_type = "exact" if template_base_name_lower == normalized_template_name else "prefix"
+                template_name = loaded_template.get("template_name", template_base_name)
+                skip_rows = loaded_template.get("skip_rows", 0)
                 
-                if is_exact_match or is_prefix_match:
-                    try:
-                        template_path = os.path.join(TEMPLATES_DIR, template_file_in_storage)
-                        with open(template_path, 'r', encoding='utf-8') as f_tpl:
-                            loaded_template = json.load(f_tpl)
-                        
-                        if "field_mappings" in loaded_template:
-                            template_found = True
-                            match_type = "exact" if is_exact_match else "prefix"
-                            template_name = loaded_template.get("template_name", template_base_name)
-                            skip_rows = loaded_template.get("skip_rows", 0)
-                            
-                            print(f"   ✅ {template_name} ({match_type}) - skip {skip_rows} rows")
-                            break
-                    except:
-                        pass
+                print(f"   ✅ {template_name} ({match_type}) - skip {skip_rows} rows")
         
         if not template_found:
             print(f"   ❌ No template match")
@@ -4,12 +4,11 @@ Local test script to debug template auto-application functionality.
 """
 
 import os
-import json
-import re
-from datetime import datetime
 
-# Simulate the constants from app.py
-TEMPLATES_DIR = "templates_storage"
+from template_test_helpers import (
+    TEMPLATES_DIR, extract_template_name, get_sorted_template_files,
+    is_template_match, load_template, load_template_index
+)
 
 def test_template_extraction_and_matching():
     """Test the template extraction and matching logic locally."""
@@ -23,10 +22,9 @@ def test_template_extraction_and_matching():
         return
     
     # Get available templates
-    template_files = [f for f in os.listdir(TEMPLATES_DIR) if f.endswith(".json")]
-    template_files.sort(key=lambda x: len(os.path.splitext(x)[0]), reverse=True)
+    template_index = load_template_index()
     
-    print(f"📁 Available templates: {[os.path.splitext(f)[0] for f in template_files]}")
+    print(f"📁 Available templates: {[entry[1] for entry in template_index]}")
     print()
     
     # Test various filename patterns
@@ -55,60 +53,41 @@ def test_template_extraction_and_matching():
         template_applied_data = None
         
         if original_filename_for_vendor:
-            name_without_extension = os.path.splitext(original_filename_for_vendor)[0]
             # Split by the first occurrence of space, underscore, or hyphen
-            parts = re.split(r'[ _-]', name_without_extension, 1)
-            if parts: 
-                template_name_from_file = parts[0]
-                print(f"   🎯 Extracted template name: '{template_name_from_file}'")
+            template_name_from_file = extract_template_name(original_filename_for_vendor)
+            print(f"   🎯 Extracted template name: '{template_name_from_file}'")
         
         # Step 2: Search for matching template
-        if template_name_from_file and os.path.exists(TEMPLATES_DIR):
+        if template_name_from_file:
             print(f"   🔍 Searching for template matching: '{template_name_from_file}'")
             normalized_template_name = template_name_from_file.lower()
             
-            for template_file_in_storage in template_files:
-                template_base_name = os.path.splitext(template_file_in_storage)[0]
-                template_base_name_lower = template_base_name.lower()
-                
+            for template_file_in_storage, template_base_name, template_base_name_lower, loaded_template in template_index:
                 # Enhanced matching: exact match or starts with
-                is_exact_match = template_base_name_lower == normalized_template_name
-                is_prefix_match = template_base_name_lower.startswith(normalized_template_name + "-") or \
-                                normalized_template_name.startswith(template_base_name_lower)
+                is_exact_match, is_prefix_match = is_template_match(template_base_name_lower, normalized_template_name)
                 
                 print(f"      📋 Checking '{template_base_name}' (lower: '{template_base_name_lower}')")
                 print(f"         - Exact match: {is_exact_match}")
                 print(f"         - Prefix match: {is_prefix_match}")
                 
-                if is_exact_match or is_prefix_match:
-                    try:
-                        template_path = os.path.join(TEMPLATES_DIR, template_file_in_storage)
-                        with open(template_path, 'r', encoding='utf-8') as f_tpl:
-                            loaded_template = json.load(f_tpl)
+                if (is_exact_match or is_prefix_match) and loaded_template is not None:
+                    if "field_mappings" in loaded_template:
+                        template_applied_data = loaded_template
+                        skip_rows = loaded_template.get("skip_rows", 0)
+                        template_name = loaded_template.get("template_name", template_base_name)
+                        field_count = len(loaded_template.get("field_mappings", []))
                         
-                        if "field_mappings" in loaded_template:
-                            template_applied_data = loaded_template
-                            skip_rows = loaded_template.get("skip_rows", 0)
-                            template_name = loaded_template.get("template_name", template_base_name)
-                            field_count = len(loaded_template.get("field_mappings", []))
-                            
-                            match_type = "exact" if is_exact_match else "prefix"
-                            print(f"   ✅ MATCH FOUND: '{template_file_in_storage}' ({match_type})")
-                            print(f"      - Template name: {template_name}")
-                            print(f"      - Skip rows: {skip_rows}")
-                            print(f"      - Field mappings: {field_count}")
-                            break
-                            
-                    except Exception as e:
-                        print(f"   ❌ Error loading template {template_file_in_storage}: {e}")
+                        match_type = "exact" if is_exact_match else "prefix"
+                        print(f"   ✅ MATCH FOUND: '{template_file_in_storage}' ({match_type})")
+                        print(f"      - Template name: {template_name}")
+                        print(f"      - Skip rows: {skip_rows}")
+                        print(f"      - Field mappings: {field_count}")
+                        break
             
             if not template_applied_data:
                 print(f"   ❌ No template found for '{template_name_from_file}'")
         else:
-            if not template_name_from_file:
-                print("   ⚠️  No template name extracted from filename")
-            else:
-                print(f"   ❌ Templates directory '{TEMPLATES_DIR}' not found")
+            print("   ⚠️  No template name extracted from filename")
     
     print("\n" + "=" * 55)
     print("🔧 Debugging Tips:")
@@ -126,13 +105,10 @@ def test_specific_template_loading():
         print(f"❌ Templates directory '{TEMPLATES_DIR}' not found!")
         return
     
-    template_files = [f for f in os.listdir(TEMPLATES_DIR) if f.endswith(".json")]
-    
-    for template_file in template_files:
-        template_path = os.path.join(TEMPLATES_DIR, template_file)
+    for entry in get_sorted_template_files():
+        template_file = entry.name
         try:
-            with open(template_path, 'r', encoding='utf-8') as f:
-                template_data = json.load(f)
+            template_data = load_template(entry.path)
             
             template_name = template_data.get('template_name', 'Unknown')
             skip_rows = template_data.get('skip_rows', 0)
@@ -3,27 +3,30 @@
 Test file upload functionality locally
 """
 
+import io
+import os
 import requests
+from requests.adapters import HTTPAdapter
 import json
 
+# Shared session so the uploads reuse pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
 def test_csv_upload():
     """Test CSV file upload"""
     print("📁 Testing CSV file upload...")
     
-    # Create a simple test CSV file
+    # Test CSV content, posted straight from memory
     test_csv_content = """Date,Description,Amount,Vendor
 2024-01-01,Office Supplies,100.00,Acme Corp
 2024-01-02,Software License,500.00,Tech Solutions
 2024-01-03,Consulting Services,1200.00,Business Advisors"""
     
-    with open("test_file.csv", "w") as f:
-        f.write(test_csv_content)
-    
     try:
         # Test file upload
-        with open("test_file.csv", "rb") as f:
-            files = {"files[]": f}
-            response = requests.post("http://localhost:8000/upload", files=files, timeout=60)
+        files = {"files[]": ("test_file.csv", io.BytesIO(test_csv_content.encode("utf-8")), "text/csv")}
+        response = SESSION.post("http://localhost:8000/upload", files=files, timeout=60)
         
         if response.status_code == 200:
             print("✅ CSV upload test passed!")
@@ -38,12 +41,6 @@ def test_csv_upload():
     
     except Exception as e:
         print(f"❌ CSV upload test failed: {e}")
-    
-    finally:
-        # Clean up test file
-        import os
-        if os.path.exists("test_file.csv"):
-            os.remove("test_file.csv")
 
 def test_pdf_upload():
     """Test PDF file upload (if you have a test PDF)"""
@@ -58,7 +55,7 @@ def test_pdf_upload():
             try:
                 with open(pdf_file, "rb") as f:
                     files = {"files[]": f}
-                    response = requests.post("http://localhost:8000/upload", files=files, timeout=120)
+                    response = SESSION.post("http://localhost:8000/upload", files=files, timeout=120)
                 
                 if response.status_code == 200:
                     print("✅ PDF upload test passed!")
@@ -77,8 +74,6 @@ def test_pdf_upload():
     print("ℹ️  No test PDF files found. Skipping PDF test.")
 
 if __name__ == "__main__":
-    import os
-    
     print("🧪 Testing file upload functionality")
     print("=" * 50)
     
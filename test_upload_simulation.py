@@ -3,33 +3,45 @@
 Simulate the actual upload process to test template auto-application.
 """
 
+import itertools
 import os
-import json
 import tempfile
 import csv
 from io import StringIO
 
+from template_test_helpers import (
+    TEMPLATES_DIR, extract_template_name, find_template_match
+)
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None  # test_actual_flask_endpoint is skipped without it
+
+# Shared session so endpoint requests reuse pooled keep-alive connections
+if requests is not None:
+    SESSION = requests.Session()
+    SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
 def create_test_csv_file(filename, headers, data_rows):
     """Create a test CSV file with given headers and data."""
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        
-        # Add some empty rows to test skip_rows functionality
-        if "Basic" in filename:
-            # Basic template has skip_rows: 10
-            for i in range(10):
-                writer.writerow([f"Skip row {i+1}", "", "", ""])
-        elif "Alpha-Med-WithHeaders" in filename:
-            # Alpha-Med-WithHeaders has skip_rows: 4
-            for i in range(4):
-                writer.writerow([f"Header row {i+1}", "", "", ""])
-        
-        # Write actual headers
-        writer.writerow(headers)
-        
-        # Write data rows
-        for row in data_rows:
-            writer.writerow(row)
+    # Add some filler rows to test skip_rows functionality
+    if "Basic" in filename:
+        # Basic template has skip_rows: 10
+        rows = [[f"Skip row {i+1}", "", "", ""] for i in range(10)]
+    elif "Alpha-Med-WithHeaders" in filename:
+        # Alpha-Med-WithHeaders has skip_rows: 4
+        rows = [[f"Header row {i+1}", "", "", ""] for i in range(4)]
+    else:
+        rows = []
+    
+    # Actual headers, then the data rows
+    rows.append(headers)
+    rows.extend(data_rows)
+    
+    with open(filename, 'w', newline='', encoding='utf-8', buffering=64 * 1024) as csvfile:
+        csv.writer(csvfile).writerows(rows)
 
 def simulate_upload_process():
     """Simulate the upload process with template auto-application."""
@@ -65,6 +77,8 @@ def simulate_upload_process():
         }
     ]
     
+    templates_dir_exists = os.path.isdir(TEMPLATES_DIR)
+    
     for test_case in test_cases:
         print(f"\n📄 Testing: {test_case['filename']}")
         print("-" * 40)
@@ -80,53 +94,36 @@ def simulate_upload_process():
             # Simulate the template matching logic from app.py
             original_filename_for_vendor = test_case['filename']
             template_applied_data = None
-            TEMPLATES_DIR = "templates_storage"
             
             # Extract template name
             template_name_from_file = ""
             if original_filename_for_vendor:
-                name_without_extension = os.path.splitext(original_filename_for_vendor)[0]
-                import re
-                parts = re.split(r'[ _-]', name_without_extension, 1)
-                if parts: 
-                    template_name_from_file = parts[0]
-                    print(f"🎯 Extracted template name: '{template_name_from_file}'")
+                template_name_from_file = extract_template_name(original_filename_for_vendor)
+                print(f"🎯 Extracted template name: '{template_name_from_file}'")
             
             # Search for template
-            if template_name_from_file and os.path.exists(TEMPLATES_DIR):
+            if template_name_from_file and templates_dir_exists:
                 normalized_template_name = template_name_from_file.lower()
-                template_files = [f for f in os.listdir(TEMPLATES_DIR) if f.endswith(".json")]
-                template_files.sort(key=lambda x: len(os.path.splitext(x)[0]), reverse=True)
                 
-                for template_file_in_storage in template_files:
-                    template_base_name = os.path.splitext(template_file_in_storage)[0]
-                    template_base_name_lower = template_base_name.lower()
+                # Same specificity-ordered scan as app.py; the first usable match wins
+                match = find_template_match(normalized_template_name)
+                
+                if match is not None:
+                    _, template_base_name, template_base_name_lower, loaded_template = match
+                    template_applied_data = loaded_template
+                    skip_rows = loaded_template.get("skip_rows", 0)
+                    template_name = loaded_template.get("template_name", template_base_name)
                     
-                    is_exact_match = template_base_name_lower == normalized_template_name
-                    is_prefix_match = template_base_name_lower.startswith(normalized_template_name + "-") or \
-                                    normalized_template_name.startswith(template_base_name_lower)
+                    match_type = "exact" if template_base_name_lower == normalized_template_name else "prefix"
+                    print(f"🎯 Template '{template_name}' auto-applied ({match_type} match) with {skip_rows} skip rows")
                     
-                    if is_exact_match or is_prefix_match:
-                        template_path = os.path.join(TEMPLATES_DIR, template_file_in_storage)
-                        with open(template_path, 'r', encoding='utf-8') as f_tpl:
-                            loaded_template = json.load(f_tpl)
-                        
-                        if "field_mappings" in loaded_template:
-                            template_applied_data = loaded_template
-                            skip_rows = loaded_template.get("skip_rows", 0)
-                            template_name = loaded_template.get("template_name", template_base_name)
-                            
-                            match_type = "exact" if is_exact_match else "prefix"
-                            print(f"🎯 Template '{template_name}' auto-applied ({match_type} match) with {skip_rows} skip rows")
-                            
-                            # Show field mappings
-                            field_mappings = loaded_template.get("field_mappings", [])
-                            print(f"📋 Field mappings ({len(field_mappings)}):")
-                            for mapping in field_mappings[:3]:  # Show first 3
-                                print(f"   - '{mapping['original_header']}' → {mapping['mapped_field']}")
-                            if len(field_mappings) > 3:
-                                print(f"   - ... and {len(field_mappings) - 3} more")
-                            break
+                    # Show field mappings
+                    field_mappings = loaded_template["field_mappings"]
+                    print(f"📋 Field mappings ({len(field_mappings)}):")
+                    for mapping in field_mappings[:3]:  # Show first 3
+                        print(f"   - '{mapping['original_header']}' → {mapping['mapped_field']}")
+                    if len(field_mappings) > 3:
+                        print(f"   - ... and {len(field_mappings) - 3} more")
             
             if not template_applied_data:
                 print(f"❌ No template found for '{template_name_from_file}'")
@@ -135,11 +132,12 @@ def simulate_upload_process():
             # Simulate header extraction with skip_rows
             print(f"\n📊 File Analysis:")
             with open(temp_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                print(f"   - Total lines: {len(lines)}")
+                # Keep only the lines up to the header row; the rest are just counted
+                skip_rows = template_applied_data.get("skip_rows", 0) if template_applied_data else 0
+                lines = list(itertools.islice(f, max(skip_rows, 0) + 1))
+                print(f"   - Total lines: {len(lines) + sum(1 for _ in f)}")
                 
                 if template_applied_data:
-                    skip_rows = template_applied_data.get("skip_rows", 0)
                     if skip_rows > 0:
                         print(f"   - Skipping first {skip_rows} rows")
                         if skip_rows < len(lines):
@@ -173,9 +171,11 @@ def test_actual_flask_endpoint():
     print(f"\n🌐 Testing Actual Flask Endpoint:")
     print("-" * 35)
     
+    if requests is None:
+        print("⚠️  requests library not available")
+        return
+    
     try:
-        import requests
-        
         # Test with a simple file upload
         test_url = "http://localhost:5000/upload"  # Local Flask server
         
@@ -185,7 +185,7 @@ def test_actual_flask_endpoint():
         files = {'files[]': ('Basic_test.csv', test_content, 'text/csv')}
         
         print(f"📤 Attempting upload to {test_url}")
-        response = requests.post(test_url, files=files, timeout=10)
+        response = SESSION.post(test_url, files=files, timeout=10)
         
         if response.status_code == 200:
             result = response.json()
@@ -204,8 +204,6 @@ def test_actual_flask_endpoint():
         else:
             print(f"❌ Upload failed: {response.status_code}")
             
-    except ImportError:
-        print("⚠️  requests library not available")
     except Exception as e:
         print(f"❌ Error testing Flask endpoint: {e}")
         print("💡 Make sure Flask server is running on localhost:5000")
@@ -5,16 +5,20 @@ Tests configuration storage, encryption, and management functionality.
 """
 
 import os
+import json
 import tempfile
 import shutil
 from pathlib import Path
+from unittest.mock import patch
+
+import pytest
 
 from invoice_matching.models import (
     SQLConnectionConfig, APIConnectionConfig, MatchingSettings,
     ConnectionType, AuthenticationType
 )
 from invoice_matching.config.config_manager import ConfigManager
-from invoice_matching.config.encryption import CredentialEncryption
+from invoice_matching.config.encryption import CredentialEncryption, _load_aesgcm
 
 
 class TestCredentialEncryption:
@@ -27,7 +31,10 @@ class TestCredentialEncryption:
         info = encryption.get_key_info()
         assert info['initialized'] is True
         assert info['key_source'] == 'provided'
-        assert info['algorithm'] == 'Simple Base64 + Key Mixing'
+        if _load_aesgcm() is not None:
+            assert info['algorithm'] == 'AES-256-GCM'
+        else:
+            assert info['algorithm'] == 'Simple Base64 + Key Mixing'
     
     def test_encrypt_decrypt_cycle(self):
         """Test encrypting and decrypting data."""
@@ -41,6 +48,14 @@ class TestCredentialEncryption:
         assert decrypted == original
         assert len(encrypted) > len(original)
     
+    def test_decrypt_legacy_key_mixed_value(self):
+        """Test that values stored with the legacy scheme still decrypt."""
+        encryption = CredentialEncryption("secret_key")
+        
+        legacy_encrypted = encryption._simple_encrypt("my_secret_password")
+        
+        assert encryption.decrypt(legacy_encrypted) == "my_secret_password"
+    
     def test_encrypt_empty_string(self):
         """Test encrypting empty string."""
         encryption = CredentialEncryption("test_key")
@@ -63,24 +78,30 @@ class TestCredentialEncryption:
         assert encryption.is_encrypted("") is False
         assert encryption.is_encrypted("short") is False
 
+    def test_is_encrypted_legacy_shape(self):
+        """Test that legacy values are detected by their base64 shape."""
+        encryption = CredentialEncryption("test_key")
+        legacy = encryption._simple_encrypt("a_long_enough_legacy_password_value_1234")
+
+        assert encryption.is_encrypted(legacy) is True
+        assert encryption.is_encrypted(legacy[:-4] + "a b=") is False
+        assert encryption.is_encrypted(legacy[:-1]) is False
+
 
 class TestConfigManager:
     """Test cases for configuration manager."""
     
-    def setup_method(self):
-        """Setup test environment."""
-        # Create temporary directory for tests
-        self.temp_dir = tempfile.mkdtemp()
+    @pytest.fixture(autouse=True)
+    def config_manager_in_tmp_path(self, tmp_path):
+        """Give each test a config manager in pytest's per-test tmp_path."""
+        # pytest creates tmp_path under one session root and prunes old roots
+        # itself, so no per-test rmtree is needed
+        self.temp_dir = str(tmp_path)
         self.config_manager = ConfigManager(
             config_dir=self.temp_dir,
             encryption_key="test_encryption_key"
         )
     
-    def teardown_method(self):
-        """Cleanup test environment."""
-        if os.path.exists(self.temp_dir):
-            shutil.rmtree(self.temp_dir)
-    
     def test_config_manager_creation(self):
         """Test creating configuration manager."""
         assert self.config_manager.config_dir == Path(self.temp_dir)
@@ -247,6 +268,76 @@ class TestConfigManager:
         assert result is True
         assert not self.config_manager.connection_exists("test-delete")
     
+    def test_connections_file_cached_until_changed(self):
+        """Test that connections.json is parsed once and re-read after external edits."""
+        config = APIConnectionConfig(
+            connection_id="api-cached",
+            base_url="https://cached.example.com",
+            api_key="cached_key",
+            authentication_type=AuthenticationType.API_KEY
+        )
+        self.config_manager.save_connection_config(config)
+        
+        first = self.config_manager._read_connections()
+        assert self.config_manager._read_connections() is first
+        assert self.config_manager.connection_exists("api-cached")
+        
+        # Another process rewrites the file; the next lookup sees it
+        self.config_manager.connections_file.write_text(json.dumps({}))
+        
+        assert not self.config_manager.connection_exists("api-cached")
+        assert self.config_manager.list_connections() == []
+
+    def test_loaded_data_does_not_alias_cache(self):
+        """Test that changing loaded or saved data does not change the cache."""
+        config = APIConnectionConfig(
+            connection_id="api-headers",
+            base_url="https://headers.example.com",
+            api_key="headers_key",
+            authentication_type=AuthenticationType.API_KEY,
+            additional_headers={"X-Tenant": "a"}
+        )
+        self.config_manager.save_connection_config(config)
+        
+        loaded = self.config_manager.load_connection_config("api-headers")
+        loaded.additional_headers["X-Tenant"] = "changed"
+        editable = self.config_manager._load_connections_file()
+        editable["api-headers"]["additional_headers"]["X-Extra"] = "1"
+        
+        reloaded = self.config_manager.load_connection_config("api-headers")
+        assert reloaded.additional_headers == {"X-Tenant": "a"}
+        
+        # A dictionary handed to the save is not kept by reference either
+        self.config_manager._save_connections_file(editable)
+        editable["api-headers"]["base_url"] = "https://unsaved.example.com"
+        
+        assert self.config_manager._read_connections()["api-headers"]["base_url"] == "https://headers.example.com"
+    
+    def test_connections_file_replaced_atomically(self):
+        """Test that saving leaves valid JSON and no temporary file behind."""
+        config = APIConnectionConfig(
+            connection_id="api-atomic",
+            base_url="https://atomic.example.com",
+            api_key="atomic_key",
+            authentication_type=AuthenticationType.API_KEY
+        )
+        self.config_manager.save_connection_config(config)
+
+        saved = json.loads(self.config_manager.connections_file.read_text())
+        assert "api-atomic" in saved
+        assert list(Path(self.temp_dir).glob("*.tmp")) == []
+    
+    def test_failed_save_keeps_file_and_removes_temp(self):
+        """Test that a failed replace leaves the old file and no temp file."""
+        self.config_manager._save_connections_file({"kept": {"config_type": "api"}})
+        
+        with patch('invoice_matching.config.config_manager.os.replace', side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                self.config_manager._save_connections_file({"lost": {"config_type": "api"}})
+        
+        assert json.loads(self.config_manager.connections_file.read_text()) == {"kept": {"config_type": "api"}}
+        assert list(Path(self.temp_dir).glob("*.tmp")) == []
+
     def test_delete_nonexistent_config(self):
         """Test deleting non-existent configuration."""
         result = self.config_manager.delete_connection_config("nonexistent")
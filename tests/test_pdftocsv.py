@@ -0,0 +1,160 @@
+"""
+Unit tests for PDF table extraction.
+
+Tests the cached_extraction wrapper and page selection in the pdfplumber
+extractor.
+"""
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("pdfplumber")
+
+import pdftocsv
+from pdftocsv import cached_extraction, extract_tables_from_file_pdfplumber
+
+
+def _build_pdf(page_texts):
+    """Build a minimal PDF with one line of Helvetica text per page."""
+    page_ids = [4 + 2 * i for i in range(len(page_texts))]
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: ("<< /Type /Pages /Kids [%s] /Count %d >>"
+            % (" ".join(f"{pid} 0 R" for pid in page_ids), len(page_texts))).encode(),
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    for pid, text in zip(page_ids, page_texts):
+        stream = f"BT /F1 10 Tf 50 700 Td ({text}) Tj ET".encode()
+        objects[pid] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                        f"/Resources << /Font << /F1 3 0 R >> >> /Contents {pid + 1} 0 R >>").encode()
+        objects[pid + 1] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(pdf)
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, objects[number])
+    xref_offset = len(pdf)
+    size = max(objects) + 1
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for number in range(1, size):
+        pdf += b"%010d 00000 n \n" % offsets[number]
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref_offset)
+    return bytes(pdf)
+
+
+@pytest.fixture
+def three_page_statement(tmp_path):
+    """A three page statement with one invoice line per page."""
+    pdf_path = tmp_path / "statement.pdf"
+    pdf_path.write_bytes(_build_pdf([
+        f"{n} 01/15/24 INVOICE 100{n} PO{n} {n}00.00 1 {n}00.00" for n in (1, 2, 3)
+    ]))
+    return pdf_path
+
+
+class TestPageSelection:
+    """Test cases for restricting extraction to selected pages."""
+
+    def test_positional_pages_without_cache(self, three_page_statement, tmp_path, monkeypatch):
+        """Test that a positional page list is honoured with caching off."""
+        monkeypatch.delenv(pdftocsv.CACHE_DIR_ENV, raising=False)
+
+        tables = extract_tables_from_file_pdfplumber(
+            str(three_page_statement), str(tmp_path / "out.csv"), [2]
+        )
+
+        assert len(tables) == 1
+        assert list(tables[0]["Invoice_Number"]) == ["1002"]
+
+    def test_positional_pages_with_cache(self, three_page_statement, tmp_path, monkeypatch):
+        """Test that positional pages are keyed and forwarded with caching on."""
+        monkeypatch.setenv(pdftocsv.CACHE_DIR_ENV, str(tmp_path / "cache"))
+        output = str(tmp_path / "out.csv")
+
+        all_pages = extract_tables_from_file_pdfplumber(str(three_page_statement), output)
+        page_three = extract_tables_from_file_pdfplumber(str(three_page_statement), output, [3])
+
+        assert list(all_pages[0]["Invoice_Number"]) == ["1001", "1002", "1003"]
+        assert list(page_three[0]["Invoice_Number"]) == ["1003"]
+
+    def test_force_refresh_is_keyword_only(self, tmp_path, monkeypatch):
+        """Test that the wrapper maps positional options to parameter names."""
+        monkeypatch.delenv(pdftocsv.CACHE_DIR_ENV, raising=False)
+        calls = []
+
+        @cached_extraction("fake")
+        def fake_extractor(input_doc_path_str, output_csv_path_str=None, pages=None):
+            calls.append(pages)
+            return []
+
+        fake_extractor(str(tmp_path / "in.pdf"), None, [1, 4])
+
+        assert calls == [[1, 4]]
+        with pytest.raises(TypeError):
+            fake_extractor(str(tmp_path / "in.pdf"), None, [1], [2])
+
+
+class TestExtractionCache:
+    """Test cases for the on-disk extraction cache."""
+
+    def test_ci_bypasses_cached_results(self, tmp_path, monkeypatch):
+        """Test that cached results are reused, except when CI is set."""
+        import pandas as pd
+
+        monkeypatch.setenv(pdftocsv.CACHE_DIR_ENV, str(tmp_path / "cache"))
+        monkeypatch.delenv("CI", raising=False)
+        input_path = tmp_path / "in.pdf"
+        input_path.write_bytes(b"%PDF-1.4\n")
+        calls = []
+
+        @cached_extraction("fake-ci")
+        def fake_extractor(input_doc_path_str, output_csv_path_str=None):
+            calls.append(input_doc_path_str)
+            return [pd.DataFrame({"a": [1]})]
+
+        fake_extractor(str(input_path), str(tmp_path / "out.csv"))
+        fake_extractor(str(input_path), str(tmp_path / "out.csv"))
+        assert len(calls) == 1
+
+        monkeypatch.setenv("CI", "true")
+        fake_extractor(str(input_path), str(tmp_path / "out.csv"))
+        assert len(calls) == 2
+
+        cached_files = [p.name for p in (tmp_path / "cache").iterdir()]
+        assert cached_files and all(f"_v{pdftocsv._code_version()}" in name for name in cached_files)
+
+
+class TestExtractorSelection:
+    """Test cases for choosing between docling and pdfplumber."""
+
+    def test_docling_not_selected_off_main_thread(self, tmp_path, monkeypatch):
+        """Test that worker threads (e.g. Flask request handlers) use pdfplumber."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        monkeypatch.setenv(pdftocsv.ENABLE_DOCLING_ENV, "1")
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            method = pool.submit(pdftocsv._select_extraction_method, str(tmp_path / "in.pdf"), 64.0).result()
+
+        assert method == "pdfplumber"
+
+    def test_docling_runtime_error_falls_back_to_pdfplumber(self, tmp_path, monkeypatch):
+        """Test that a docling failure at run time still returns pdfplumber's tables."""
+        pytest.importorskip("psutil")
+        calls = []
+
+        def failing_docling(*args, **kwargs):
+            calls.append("docling")
+            raise RuntimeError("model load failed")
+
+        def fake_pdfplumber(*args, **kwargs):
+            calls.append("pdfplumber")
+            return ["table"]
+
+        monkeypatch.setattr(pdftocsv, "_select_extraction_method", lambda *args: "docling")
+        monkeypatch.setitem(pdftocsv.EXTRACTION_METHODS, "docling", failing_docling)
+        monkeypatch.setitem(pdftocsv.EXTRACTION_METHODS, "pdfplumber", fake_pdfplumber)
+
+        assert pdftocsv.extract_tables_from_file(str(tmp_path / "in.pdf")) == ["table"]
+        assert calls == ["docling", "pdfplumber"]